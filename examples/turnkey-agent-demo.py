@@ -23,7 +23,8 @@ Usage:
 import asyncio
 import os
 import time
-from typing import List
+from types import MappingProxyType
+from typing import Dict, List
 from dotenv import load_dotenv
 
 from spoon_ai.agents.toolcall import ToolCallAgent
@@ -60,8 +61,8 @@ load_dotenv()
 class TurnkeyAgentDemo:
     """Turnkey Agent-based comprehensive demonstration"""
 
-    # Embedded test data with all configurations
-    TEST_DATA = {
+    # Embedded test data with all configurations (read-only, shared by all instances)
+    TEST_DATA = MappingProxyType({
         "network": "sepolia",
         "chain_id": 11155111,
         "rpc_url": "https://1rpc.io/sepolia",
@@ -164,7 +165,18 @@ class TurnkeyAgentDemo:
                 "mnemonic_length": 24
             }
         }
-    }
+    })
+
+    # Resolved once at class creation instead of per instance
+    network = TEST_DATA["network"]
+    chain_id = TEST_DATA["chain_id"]
+    rpc_url = TEST_DATA["rpc_url"]
+    explorer = TEST_DATA["explorer"]
+    transaction_templates = TEST_DATA["transaction_templates"]
+    eip712_templates = TEST_DATA["eip712_templates"]
+    message_templates = TEST_DATA["message_templates"]
+    batch_settings = TEST_DATA["batch_settings"]
+    wallet_templates = TEST_DATA["wallet_templates"]
 
     def __init__(self):
         """Initialize the demo with embedded test data"""
@@ -172,51 +184,14 @@ class TurnkeyAgentDemo:
         self.agents = {}
 
     def load_test_data(self):
-        """Load test data from embedded TEST_DATA configuration"""
-        try:
-            data = self.TEST_DATA
-            
-            # Load basic configuration
-            self.network = data.get("network", "sepolia")
-            self.chain_id = data.get("chain_id", 11155111)
-            self.rpc_url = data.get("rpc_url", "")
-            self.explorer = data.get("explorer", "")
-            
-            # Load transaction templates
-            self.transaction_templates = data.get("transaction_templates", {})
-            
-            # Load EIP-712 templates
-            self.eip712_templates = data.get("eip712_templates", {})
-            
-            # Load message templates
-            self.message_templates = data.get("message_templates", {})
-            
-            # Load batch settings
-            self.batch_settings = data.get("batch_settings", {})
-            
-            # Load wallet templates
-            self.wallet_templates = data.get("wallet_templates", {})
-            
-            print(f"✅ Loaded test data from embedded configuration")
-            print(f"   Network: {self.network} (Chain ID: {self.chain_id})")
-            print(f"   RPC URL: {self.rpc_url}")
-            print(f"   Explorer: {self.explorer}")
-            print(f"   Transaction Templates: {len(self.transaction_templates)}")
-            print(f"   EIP-712 Templates: {len(self.eip712_templates)}")
-            print(f"   Message Templates: {len(self.message_templates)}")
-            
-        except Exception as e:
-            print(f"❌ Failed to load test data: {e}")
-            # Set minimal defaults
-            self.network = "sepolia"
-            self.chain_id = 11155111
-            self.rpc_url = "https://1rpc.io/sepolia"
-            self.explorer = "https://sepolia.etherscan.io"
-            self.transaction_templates = {}
-            self.eip712_templates = {}
-            self.message_templates = {}
-            self.batch_settings = {}
-            self.wallet_templates = {}
+        """Print a summary of the embedded TEST_DATA configuration"""
+        print(f"✅ Loaded test data from embedded configuration")
+        print(f"   Network: {self.network} (Chain ID: {self.chain_id})")
+        print(f"   RPC URL: {self.rpc_url}")
+        print(f"   Explorer: {self.explorer}")
+        print(f"   Transaction Templates: {len(self.transaction_templates)}")
+        print(f"   EIP-712 Templates: {len(self.eip712_templates)}")
+        print(f"   Message Templates: {len(self.message_templates)}")
 
     def create_agent(self, name: str, tools: List, description: str) -> ToolCallAgent:
         """Create a specialized agent with specific tools"""
@@ -352,6 +327,17 @@ class TurnkeyAgentDemo:
             "Expert in monitoring Turnkey activities and organization status"
         )
 
+    async def run_all(self, prompts: Dict[str, str], max_concurrency: int = 5) -> Dict[str, str]:
+        """Run one prompt per agent concurrently, keyed by agent name"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(name: str, prompt: str):
+            async with semaphore:
+                return name, await self.agents[name].run(prompt)
+
+        results = await asyncio.gather(*(run_one(name, prompt) for name, prompt in prompts.items()))
+        return dict(results)
+
     def print_section_header(self, title: str):
         """Print formatted section header"""
         print(f"\n{'='*80}")
@@ -154,7 +154,12 @@ function connectWebSocket() {
     };
 
     websocket.onmessage = (event) => {
-        handleBackendMessage(JSON.parse(event.data));
+        // Binary frames are MP3 clips; everything else is a JSON message
+        if (typeof event.data === 'string') {
+            handleBackendMessage(JSON.parse(event.data));
+        } else {
+            playAudio(event.data);
+        }
     };
 
     websocket.onerror = (error) => {
@@ -178,8 +183,9 @@ function handleBackendMessage(data) {
             }
         }
         setState(AppState.READY);
-    } else if (data.type === 'audio') {
-        playAudio(data.audio);
+    } else if (data.type === 'audio_end') {
+        audioStreamDone = true;
+        if (!audioPlaying) setState(AppState.READY);
     } else if (data.type === 'status') {
         if (data.status === 'processing') setState(AppState.PROCESSING);
     } else if (data.type === 'error') {
@@ -188,12 +194,33 @@ function handleBackendMessage(data) {
     }
 }
 
-function playAudio(base64Audio) {
+// Replies arrive as one clip per sentence; play them back to back
+const audioQueue = [];
+let audioPlaying = false;
+let audioStreamDone = true;
+
+function playAudio(clip) {
+    if (!audioPlaying && audioQueue.length === 0) audioStreamDone = false;
+    audioQueue.push(clip);
+    if (!audioPlaying) playNextAudio();
+}
+
+function playNextAudio() {
+    const next = audioQueue.shift();
+    if (next === undefined) {
+        audioPlaying = false;
+        if (audioStreamDone) setState(AppState.READY);
+        return;
+    }
+    audioPlaying = true;
     setState(AppState.SPEAKING);
-    // Be careful with the base64 prefix
-    const audio = new Audio("data:audio/mp3;base64," + base64Audio);
+    const url = URL.createObjectURL(new Blob([next], { type: 'audio/mpeg' }));
+    const audio = new Audio(url);
+    audio.onended = () => {
+        URL.revokeObjectURL(url);
+        playNextAudio();
+    };
     audio.play();
-    audio.onended = () => setState(AppState.READY);
 }
 
 function speakResponse(text) {
@@ -11,7 +11,6 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 if __name__ == "__main__":
-    import uvicorn
     import warnings
     import logging
     
@@ -19,7 +18,7 @@ if __name__ == "__main__":
     warnings.filterwarnings("ignore", category=DeprecationWarning)
     logging.getLogger("spoon_ai.llm.manager").setLevel(logging.ERROR)
     
-    from src.server import app
+    from src.server import serve
     
     print("=" * 60)
     print("🚀 Starting FlowChain Server")
@@ -29,5 +28,5 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    serve()
 
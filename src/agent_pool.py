@@ -0,0 +1,51 @@
+"""
+Bounded pool of SpoonAI agents for FlowChain managers
+An agent refuses a second run() while one is in progress, so concurrent requests each borrow their own.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Callable, List
+
+if TYPE_CHECKING:
+    from spoon_ai.agents.toolcall import ToolCallAgent
+
+
+class AgentPool:
+    """
+    Lends out up to `size` agents built by `factory`, creating them only as concurrency demands.
+    The most recently returned agent is lent first, so a single user keeps one conversation history.
+    """
+
+    def __init__(self, factory: Callable[[], "ToolCallAgent"], size: int = 4):
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle: List["ToolCallAgent"] = []
+        self._created = 0
+        self._available = asyncio.Condition()
+
+    async def run(self, query: str) -> str:
+        agent = await self._acquire()
+        try:
+            return await agent.run(query)
+        finally:
+            await self._release(agent)
+
+    async def _acquire(self) -> "ToolCallAgent":
+        async with self._available:
+            while not self._idle and self._created >= self.size:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self.factory()
+        except BaseException:
+            async with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    async def _release(self, agent: "ToolCallAgent"):
+        async with self._available:
+            self._idle.append(agent)
+            self._available.notify()
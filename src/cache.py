@@ -0,0 +1,71 @@
+"""
+In-process response cache for FlowChain
+Short-lived memoization for deterministic answers (portfolio, routing) so repeat
+questions don't re-hit the Neo RPC or the LLM.
+"""
+
+import asyncio
+import string
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for free text: lowercase, punctuation dropped, whitespace collapsed"""
+    return " ".join(text.translate(_PUNCTUATION).lower().split())
+
+
+class TTLCache:
+    """
+    Cache whose entries expire `ttl` seconds after being stored.
+    With `maxsize` set, the least recently used entry is evicted once it is full.
+    """
+
+    def __init__(self, ttl: float = 10.0, maxsize: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value for `ttl` seconds (defaults to the cache TTL)"""
+        self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value or await `factory()` to fill it.
+        Concurrent misses share one lock so only a single upstream call is made.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        async with self._lock:
+            value = self.get(key, sentinel)
+            if value is sentinel:
+                value = await factory()
+                self.set(key, value)
+            return value
@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
+# Load environment variables from .env file.
+# Other modules import this one rather than calling load_dotenv() themselves.
 load_dotenv()
 
 # Identity & Keys
@@ -14,6 +15,7 @@ ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 
 # Neo Blockchain Configuration
 NEO_RPC_URL = os.getenv("NEO_RPC_URL", "https://testnet1.neo.coz.io:443")
+NEO_ADDRESS = os.getenv("NEO_ADDRESS", "")
 NEO_NETWORK = os.getenv("NEO_NETWORK", "testnet")  # mainnet or testnet
 USE_MOCK_WALLET = os.getenv("USE_MOCK_WALLET", "false").lower() == "true"
 
@@ -23,4 +25,16 @@ COLD_STORAGE_ADDRESS = os.getenv("COLD_STORAGE_ADDRESS")
 # Application Settings
 DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
 ENABLE_VOICE = os.getenv("ENABLE_VOICE", "false").lower() == "true"
+# Speech-to-text for voice mode: "google" (free web API) or "whisper" (local, needs faster-whisper)
+STT_ENGINE = os.getenv("STT_ENGINE", "google").lower()
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small.en")
+# Tool status lines (mock mode, Turnkey signing, research) are logged at INFO
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 USE_TURNKEY_SIGNING = os.getenv("USE_TURNKEY_SIGNING", "true").lower() == "true"
+LLM_MAX_CONCURRENCY = int(os.getenv("FLOWCHAIN_CONCURRENCY", "8"))
+# Parallel runs per NeoFS/Turnkey manager; each one holds its own agent and history
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "4"))
+# How long a token's 4h chart data and its summary are reused before refetching
+MARKET_TTL_SECONDS = float(os.getenv("MARKET_TTL_SECONDS", "3600"))
+# Web server processes; each loads its own agents, so raise only with memory to spare
+WEB_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
@@ -0,0 +1,20 @@
+"""
+Event loop selection for FlowChain entrypoints
+Uses uvloop (POSIX) or winloop (Windows) when installed, else the stock asyncio loop.
+"""
+
+import asyncio
+import sys
+
+
+def install_fast_event_loop() -> bool:
+    """Sets a libuv-backed event loop policy if available. Returns True if one was installed."""
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(fast_loop.EventLoopPolicy())
+    return True
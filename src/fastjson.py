@@ -0,0 +1,30 @@
+"""
+JSON helpers for FlowChain
+Uses orjson when installed (several times faster on small RPC/LLM payloads), else stdlib json.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    def dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
@@ -0,0 +1,279 @@
+"""
+Keyword intent routing and mood detection for FlowChain
+Resolves unambiguous requests locally so only ambiguous ones need an LLM round-trip.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from src import fastjson
+
+# Up to this many characters of the same sentence may separate a verb from its object
+_NEAR = r"\b[^.?!\n]{0,40}?\b"
+
+# One alternation per category; the leftmost keyword in the message decides.
+# Everyday words ("support", "store", "sign", "trend", "download", "files") only count
+# next to a domain noun, so "thanks for your support" or "sign up" don't skip the router.
+_INTENT_RE = re.compile(
+    r"\b(?:"
+    r"(?P<neofs>neofs|upload(?:s|ed|ing)?"
+    r"|(?:download|store|save|retrieve|fetch)\w*" + _NEAR + r"(?:files?|documents?|pdfs?|photos?|objects?)"
+    r"|(?:files?|object) storage)"
+    r"|(?P<turnkey>turnkey|passkeys?|private keys?|(?:create|make|new) (?:me )?(?:a )?(?:new )?wallets?"
+    r"|sign(?:s|ed|ing)?" + _NEAR + r"(?:transactions?|tx|transfers?|payloads?|messages?)"
+    r"|batch (?:sign\w*|transactions?|transfers?))"
+    r"|(?P<market>prices?|charts?|rsi|macd|moving averages?|technical (?:analysis|indicators?)"
+    r"|support (?:and|&) resistance|(?:support|resistance) (?:levels?|lines?|zones?)"
+    r"|price trends?|trend(?:s|ing)? (?:for|of|on) (?:eth|ethereum|btc|bitcoin|neo|gas|crypto|the market))"
+    r")\b",
+    re.IGNORECASE,
+)
+
+CATEGORIES = frozenset({"neofs", "turnkey", "market", "general"})
+
+# System prompt for the LLM fallback; a bare label is cheaper to generate and to parse than JSON
+ROUTER_INSTRUCTIONS = (
+    "Classify the request as neofs (storage, files), turnkey (wallets, signing, keys, batch), "
+    "market (prices, charts, trends, buy/sell advice) or general (anything else). "
+    "Reply with only one word: neofs, turnkey, market or general."
+)
+
+# The routing signal is at the start of a message; longer input only adds prompt tokens
+ROUTER_MAX_CHARS = 256
+
+# Models sometimes wrap the JSON reply in a ```json fence or add a sentence around it
+_JSON_OBJECT_RE = re.compile(r"\{.*?\}", re.DOTALL)
+
+# Explicit sequencing markers; a bare "and" is too common inside single requests
+_COMPOUND_SPLIT_RE = re.compile(r"\s*(?:;|\n|\band then\b|\bthen also\b)\s*", re.IGNORECASE)
+
+# Voice mood for a reply; one scan, the first mood word found wins.
+# Whole words only, inflections spelled out: "gains" counts, "goodbye", "insecure" and "airdrop" don't.
+_MOOD_RE = re.compile(
+    r"\b(?:(?P<happy>profit(?:s|able)?|gain(?:s|ed)?|excellent|secured?|good|great|done)"
+    r"|(?P<serious>loss(?:es)?|drop(?:s|ped|ping)?|critical|alerts?|warnings?|regret(?:s|ted)?"
+    r"|shit|errors?|failed))\b",
+    re.IGNORECASE,
+)
+
+# Tokens the market analyst covers; whole words only, so "method" is not ETH
+_TOKEN_RE = re.compile(
+    r"\b(?:(?P<ETH>eth(?:ereum)?)|(?P<BTC>btc|bitcoin)|(?P<NEO>neo))\b",
+    re.IGNORECASE,
+)
+
+# Messages without keywords shorter than this are treated as general chat
+LLM_FALLBACK_MIN_WORDS = 7
+
+# Hand-labelled phrasings that carry no routing keyword, for the local classifier.
+# "general" is a competing class only: the classifier never routes to it by itself.
+_LOCAL_EXAMPLES = {
+    "neofs": (
+        "put this document on the decentralized network",
+        "save my photos somewhere permanent",
+        "keep a backup of this pdf for me",
+        "where did my uploaded document go",
+        "fetch the object i saved yesterday",
+        "list the objects in my bucket",
+        "share this file link with my friend",
+        "delete the old backup from the network",
+        "how much space am i using on neo",
+        "archive my transaction history off chain",
+        "back up my spreadsheet to the decentralized network",
+        "put my contract pdf somewhere it cannot be deleted",
+        "get back the image i saved last week",
+        "which of my saved documents are the largest",
+        "remove the duplicate backups from my bucket",
+        "keep an encrypted copy of my seed phrase backup",
+        "move my old photos into cold archive",
+        "how long will my saved objects stay online",
+        "give me a shareable link to the backup",
+        "make a new bucket for my project documents",
+    ),
+    "turnkey": (
+        "make me a fresh account for my savings",
+        "generate an address for my new project",
+        "authorize this transaction with my key",
+        "approve the transfer from my hardware account",
+        "send some tokens to my sister's address",
+        "set up a secure account with biometrics",
+        "rotate the keys on my account",
+        "export the address of my second account",
+        "run several transfers at once",
+        "who can approve payments from this account",
+        "pay my friend twenty gas from my account",
+        "send ten neo to this address",
+        "approve the pending payment with my fingerprint",
+        "add a second approver to my account",
+        "generate a fresh deposit address",
+        "transfer my gas to the savings account",
+        "require two approvals for large payments",
+        "revoke access for my old phone",
+        "authorize the payment to the exchange",
+        "move all my tokens to a new address",
+    ),
+    "market": (
+        "should i buy bitcoin right now",
+        "is ethereum going up or down this week",
+        "what is neo trading at today",
+        "is it a good time to sell my eth",
+        "how has btc performed over the last month",
+        "will the crypto market crash soon",
+        "where is bitcoin heading after the halving",
+        "is this a bull run or a dead cat bounce",
+        "give me a forecast for ethereum",
+        "how volatile has neo been lately",
+        "is ethereum overbought after this rally",
+        "how much has bitcoin dropped since monday",
+        "is the market bullish or bearish on eth",
+        "what is the momentum on btc today",
+        "should i sell my neo before the weekend",
+        "will bitcoin break its all time high",
+        "how did ethereum do in the last hour",
+        "is now a good entry point for btc",
+        "what are traders expecting for neo next week",
+        "is the dip in ethereum a buying opportunity",
+    ),
+    "general": (
+        "how much do i have in my portfolio",
+        "what is my neo balance",
+        "explain how proof of stake works",
+        "what can you help me with today",
+        "tell me about the latest web3 news",
+        "is this airdrop a scam or legit",
+        "what does a smart contract actually do",
+        "how are my holdings doing overall",
+        "research the team behind this project",
+        "who founded the neo blockchain",
+        "what is bitcoin and how does it work",
+        "is bitcoin a good long term investment for retirement",
+        "how do i learn blockchain development",
+        "what is the difference between bitcoin and ethereum",
+        "explain how bitcoin mining works",
+        "is crypto legal in my country",
+        "what time is it",
+        "tell me a joke",
+        "what is the weather like today",
+        "recommend a good book to read",
+        "how are you doing today",
+        "what should i know before investing in crypto",
+        "is this project a scam",
+        "who is the founder of ethereum",
+        "how do taxes work on crypto gains",
+        "help me set up my phone",
+        "how do i reset the password on my email",
+        "create a login for this website",
+        "send me a summary of our chat",
+    ),
+}
+
+# Words that say nothing about the category; they are not counted as evidence
+_STOP_WORDS = frozenset(
+    "a an and are at be been before can could did do does for from has have how i i'm in is it "
+    "its me my of on or please right should so some that the this to was what when where which "
+    "who will with would you your".split()
+)
+
+# The local classifier answers only when all three hold; otherwise the LLM decides
+LOCAL_MIN_CONFIDENCE = 0.9
+# Natural-log odds of the top category over the runner-up (about 12 to 1)
+LOCAL_MIN_MARGIN = 2.5
+# Distinct words the model has seen, so one lucky word can't route a long message
+LOCAL_MIN_EVIDENCE = 2
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in _STOP_WORDS]
+
+
+class _NaiveBayes:
+    """Multinomial naive Bayes over words; microseconds per query and no dependencies."""
+
+    def __init__(self, examples: Dict[str, tuple]):
+        self.vocab = {word for texts in examples.values() for text in texts for word in _words(text)}
+        self.prior = {}
+        self.word_logp = {}
+        self.unseen_logp = {}
+        total = sum(len(texts) for texts in examples.values())
+        for category, texts in examples.items():
+            counts = Counter(word for text in texts for word in _words(text))
+            denominator = sum(counts.values()) + len(self.vocab)
+            self.prior[category] = math.log(len(texts) / total)
+            self.word_logp[category] = {w: math.log((c + 1) / denominator) for w, c in counts.items()}
+            self.unseen_logp[category] = math.log(1 / denominator)
+
+    def predict(self, text: str):
+        """
+        Returns (category, posterior probability, log-odds over the runner-up,
+        number of distinct known words) for the text.
+        """
+        words = [w for w in _words(text) if w in self.vocab]
+        scores = {
+            category: prior + sum(self.word_logp[category].get(w, self.unseen_logp[category]) for w in words)
+            for category, prior in self.prior.items()
+        }
+        best, runner_up = sorted(scores, key=scores.get, reverse=True)[:2]
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1 / total, scores[best] - scores[runner_up], len(set(words))
+
+
+_LOCAL_MODEL = _NaiveBayes(_LOCAL_EXAMPLES)
+
+
+def match_intent(query: str) -> Optional[str]:
+    """Returns the category implied by keywords in the query, or None if nothing matches."""
+    match = _INTENT_RE.search(query)
+    return match.lastgroup if match else None
+
+
+def classify_local(query: str) -> Optional[str]:
+    """
+    Specialist category from the local classifier, or None when the LLM should decide:
+    too little evidence, too close a call, or a message that looks like general chat.
+    """
+    category, confidence, margin, evidence = _LOCAL_MODEL.predict(query[:ROUTER_MAX_CHARS])
+    if (
+        category == "general"
+        or evidence < LOCAL_MIN_EVIDENCE
+        or confidence < LOCAL_MIN_CONFIDENCE
+        or margin < LOCAL_MIN_MARGIN
+    ):
+        return None
+    return category
+
+
+def match_tokens(text: str) -> List[str]:
+    """Returns the symbols of every token mentioned in the text, first mention first."""
+    return list(dict.fromkeys(match.lastgroup for match in _TOKEN_RE.finditer(text)))
+
+
+def detect_mood(text: str) -> str:
+    """Returns "happy", "serious" or "neutral" for the TTS voice settings."""
+    match = _MOOD_RE.search(text)
+    return match.lastgroup if match else "neutral"
+
+
+def split_compound(query: str) -> List[str]:
+    """Splits a multi-part request ("upload this; then check price") into its non-empty parts."""
+    return [part for part in _COMPOUND_SPLIT_RE.split(query) if part.strip()]
+
+
+def parse_category(reply: str) -> str:
+    """
+    Strictly parses the router LLM reply: a bare label, or {"category": "..."} from older prompts.
+    Raises ValueError if neither form names a known category.
+    """
+    label = (reply or "").strip().strip("`'\".").lower()
+    if label in CATEGORIES:
+        return label
+    match = _JSON_OBJECT_RE.search(reply or "")
+    if match is None:
+        raise ValueError(f"no JSON object in router reply: {reply!r}")
+    category = fastjson.loads(match.group(0)).get("category")
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category in router reply: {category!r}")
+    return category
@@ -0,0 +1,45 @@
+"""
+Logging setup for the FlowChain entrypoints
+Tool modules log through module loggers; the CLI and the server send those records to the console.
+"""
+
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from src import config
+
+_FORMAT = "[%(name)s] %(message)s"
+
+
+def configure_logging() -> Optional[QueueListener]:
+    """
+    Prints INFO and above (LOG_LEVEL) to stderr. Records are handed to a queue and written by
+    a listener thread, so a slow terminal never blocks the event loop that logged them.
+    Returns the started listener for the caller to stop on shutdown, or None when the root
+    logger was already configured (it is then left alone).
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter(_FORMAT))
+    records = queue.SimpleQueue()
+    root.addHandler(QueueHandler(records))
+    root.setLevel(config.LOG_LEVEL)
+    listener = QueueListener(records, console)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: Optional[QueueListener]):
+    """Flushes and stops a listener from configure_logging and detaches its queue from the root logger."""
+    if listener is None:
+        return
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
@@ -1,158 +1,294 @@
 import asyncio
+import codecs
+import functools
+import logging
 import os
 import sys
-import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to sys.path to allow running as script
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from dotenv import load_dotenv
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 # SDK Imports
 from spoon_ai.agents.toolcall import ToolCallAgent
 from spoon_ai.tools import ToolManager
 from spoon_ai.chat import ChatBot
-from spoon_ai.schema import Message
 
 # Project Imports
 from src import config
-from src.neo_wallet_agent import neo_integration, initialize_neo_wallet, get_neo_portfolio
+from src.sdk_patch import patch_tool_manager
+from src.eventloop import install_fast_event_loop
+from src.logsetup import configure_logging, stop_logging
+from src.intent import detect_mood, match_tokens, split_compound
+from src.router import get_intent_router, llm_semaphore
+from src.neo_wallet_agent import initialize_neo_wallet, get_neo_portfolio, close_rpc_session
 
-from src.tools.market_tool import MarketAnalyticsTool
-from src.tools.recommendation_tool import TradeRecommendationTool
-from src.tools.web3_research_tool import Web3ResearchTool
-from src.tools.neofs import NeoFSManager
-from src.tools.turnkey import TurnkeyWalletManager
-from src.tools.market import MarketAnalyst
+# Required for compatibility with current SDK Pydantic behavior
+patch_tool_manager()
 
-if config.ENABLE_VOICE:
-    from src.voice import VoiceAssistant
+# Microphone/speaker calls (and stdin reads where the loop cannot watch stdin) block for
+# seconds at a time; give them their own threads so they never compete with each other.
+_VOICE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="flowchain-voice")
+_IO_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flowchain-io")
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# --- Monkeypatch ToolManager (from examples) ---
-# Required for compatibility with current SDK Pydantic behavior
-original_init = ToolManager.__init__
-def patched_init(self, tools=None):
-    if tools is None or (isinstance(tools, dict) and 'name' in tools):
-        self.tools = []
-        self.tool_map = {}
-        self.indexed = False
-        return
-    return original_init(self, tools)
-ToolManager.__init__ = patched_init
-# -----------------------------------------------
+_EXIT_WORDS = frozenset({"exit", "quit"})
+_VOICE_EXIT_WORDS = _EXIT_WORDS | {"stop", "goodbye"}
+
+GEMINI_HOST = "generativelanguage.googleapis.com"
+
+class _Lazy:
+    """Builds the wrapped object on first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+
+    def __getattr__(self, name):
+        if self._obj is None:
+            self._obj = self._factory()
+        return getattr(self._obj, name)
+
+class _StdinReader:
+    """
+    Reads stdin lines through the event loop's selector (POSIX), so waiting for the
+    next prompt costs no thread hand-off. Lines come back with their newline; "" means EOF.
+    """
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._fd = sys.stdin.fileno()
+        self._lines = asyncio.Queue()
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(errors="replace")
+        loop.add_reader(self._fd, self._on_readable)
+
+    @classmethod
+    def create(cls, loop):
+        """Returns a reader, or None where the loop cannot watch stdin (Windows, files)."""
+        if sys.platform == "win32":
+            return None
+        try:
+            return cls(loop)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            return None
+
+    def _on_readable(self):
+        chunk = os.read(self._fd, 4096)
+        if not chunk:
+            self.close()
+            if self._pending:
+                self._lines.put_nowait(self._pending)
+            self._lines.put_nowait("")
+            return
+        *lines, self._pending = (self._pending + self._decoder.decode(chunk)).split("\n")
+        for line in lines:
+            self._lines.put_nowait(line + "\n")
+
+    async def readline(self) -> str:
+        return await self._lines.get()
+
+    def close(self):
+        self._loop.remove_reader(self._fd)
 
 class FlowChainAgent(ToolCallAgent):
     name: str = "flowchain"
     description: str = "A trading assistant for crypto assets with Neo wallet integration"
     system_prompt: str = (
-        "You are **FlowChain**, a personal AI crypto wallet assistant. "
-        "Your goal is to grow the user's capital by using the prediction model to give suggestions on when to buy and sell, "
-        "maximizing returns or cutting losses.\n\n"
-        
-        "**PERSONALITY & TONE**\n"
-        "- **Conversational & Direct**: Speak like a helpful personal assistant. Be straight to the point but use full sentences.\n"
-        "- **No Jargon**: Avoid futuristic phrases like 'Systems Online'. Just say 'I'm ready' or 'Here is the data'.\n\n"
-
-        "**CORE CAPABILITIES & TOOLS**\n"
-        "1.  **get_trade_recommendations**: USE THIS FIRST for any question about trading, predictions, or strategy. "
-        "It reads the latest trade plan from the prediction model. Explain the rationale (sentiment/macro) before giving the signal.\n"
-        "2.  **web3_research_tool**: Use for deep-dive analysis on specific tokens or market trends.\n"
-        "3.  **Neo Wallet**: You can check balances and sign transactions via Turnkey.\n\n"
-
-        "**OPERATIONAL PROTOCOLS**\n"
-        "- **On Execution**: If you execute a trade or transaction, explicitly REITERATE the action you took. Example: 'I have bought you 0.08 BTC.'\n"
-        "- **Voice Behavior**: Keep responses speakable. If there is an error (e.g., wallet connection failed), explicitly VOICE the error out to the user.\n"
-        "- **Safety**: Always verify funds before recommending execution.\n"
+        "You are FlowChain, a personal crypto wallet assistant. Help the user grow their capital "
+        "with buy/sell suggestions from the prediction model.\n"
+        "- Be conversational and direct; use plain, speakable sentences, no jargon.\n"
+        "- For trading, predictions or strategy call get_trade_recommendations first and explain "
+        "its rationale before the signal. Use web3_research_tool for token or market deep-dives. "
+        "Neo wallet balances and Turnkey signing are available.\n"
+        "- After executing a trade, restate the action (e.g. 'I have bought you 0.08 BTC.').\n"
+        "- Say any error out loud, and verify funds before recommending execution.\n"
     )
     max_steps: int = 10
 
-async def get_intent_router(llm: ChatBot, query: str) -> str:
-    """Classifies the intent of the user query."""
-    system_prompt = """
-    You are a query router. Classify the user's request into one of these categories:
-    - 'neofs': Storage, uploading, downloading, files.
-    - 'turnkey': Wallet creation, signing, keys, security, batch operations.
-    - 'market': Price analysis, charts, trends, buy/sell advice.
-    - 'general': Everything else (chat, specific NEO operations if not covered above).
-    
-    Respond with ONLY the category name in JSON format: {"category": "..."}
+async def _dispatch(category, user_msg, guardian, neofs, turnkey, market) -> str:
+    """
+    Sends the message to the agent for its category, within the LLM concurrency cap.
+    Not retried: an agent turn may already have signed or sent a transaction when it fails.
+    Not behind the Gemini breaker either: a tool or wallet error is not a Gemini outage.
+    """
+    async with llm_semaphore():
+        if category == "neofs":
+            return await neofs.run(user_msg)
+        elif category == "turnkey":
+            return await turnkey.run(user_msg)
+        elif category == "market":
+            tokens = match_tokens(user_msg)
+            if len(tokens) > 1:
+                summaries = await market.analyze_tokens(tokens)
+                return " ".join(f"{token}: {summary}" for token, summary in summaries.items())
+            return await market.analyze_token(tokens[0] if tokens else "BTC")
+        else:
+            return await guardian.run(user_msg)
+
+async def _handle(user_msg, router_llm, guardian, neofs, turnkey, market) -> str:
+    """
+    Routes and answers a message. Compound requests are split, each part routed on its own,
+    and the parts for different agents answered concurrently; replies keep the original order.
+    """
+    parts = split_compound(user_msg)
+    if len(parts) <= 1:
+        category = await get_intent_router(router_llm, user_msg)
+        logger.info("Intent detected: %s", category)
+        return await _dispatch(category, user_msg, guardian, neofs, turnkey, market)
+
+    categories = await asyncio.gather(*(get_intent_router(router_llm, part) for part in parts))
+    logger.info("Intents detected: %s", ", ".join(categories))
+
+    # An agent keeps conversation state, so parts for the same agent run one after another
+    by_category = {}
+    for index, (category, part) in enumerate(zip(categories, parts)):
+        by_category.setdefault(category, []).append((index, part))
+
+    replies = [""] * len(parts)
+
+    async def run_category(category, items):
+        for index, part in items:
+            replies[index] = await _dispatch(category, part, guardian, neofs, turnkey, market)
+
+    await asyncio.gather(*(run_category(c, items) for c, items in by_category.items()))
+    return "\n\n".join(replies)
+
+async def _warm_up_llm():
+    """
+    Resolves the Gemini host and completes a TLS handshake with it while the user reads the banner,
+    so a DNS or network problem shows up before the first turn. No request is sent, so nothing is
+    billed and no LLM slot is taken; the SDK still opens its own connection on the first call.
     """
     try:
-        response = await llm.chat([
-            Message(role="system", content=system_prompt),
-            Message(role="user", content=query)
-        ])
-        data = json.loads(response.content.strip())
-        return data.get("category", "general")
-    except:
-        return "general"
+        _, writer = await asyncio.wait_for(asyncio.open_connection(GEMINI_HOST, 443, ssl=True), 10)
+        writer.close()
+        await writer.wait_closed()
+    except (OSError, asyncio.TimeoutError) as e:
+        logger.info("LLM warm-up skipped: %s", e)
+
+def _init_voice():
+    """Builds the VoiceAssistant, returning None if it cannot start."""
+    try:
+        from src.voice import VoiceAssistant
+        print("Initializing Voice Assistant...")
+        voice_assistant = VoiceAssistant()
+        print("Voice Assistant Ready.")
+        return voice_assistant
+    except Exception as e:
+        print(f"Failed to initialize voice: {e}")
+        return None
+
+_guardian_tools = None
+
+def _load_guardian_tools() -> ToolManager:
+    # Imported here so `import src.main` stays cheap; runs in a worker thread during start-up
+    from src.tools.market_tool import MarketAnalyticsTool
+    from src.tools.recommendation_tool import TradeRecommendationTool
+    from src.tools.web3_research_tool import Web3ResearchTool
+    return ToolManager([MarketAnalyticsTool(), TradeRecommendationTool(), Web3ResearchTool()])
+
+async def _build_guardian_tools() -> ToolManager:
+    """Builds the guardian's ToolManager once; later calls (re-entrant main) reuse it."""
+    global _guardian_tools
+    if _guardian_tools is None:
+        _guardian_tools = await asyncio.to_thread(_load_guardian_tools)
+    return _guardian_tools
 
 async def main():
+    # Diagnostics go through a queue to a writer thread; replies and prompts stay on print()
+    log_listener = configure_logging()
     print("Initializing FlowChain Guardian Agent with Neo Wallet...")
 
-    # 1. Initialize Neo Wallet Integration
+    # 1. Neo wallet, guardian tools and voice are independent; bring them up together
     print("🔗 Connecting to Neo N3 blockchain...")
-    neo_success = await initialize_neo_wallet()
-    
+    voice_init = asyncio.to_thread(_init_voice) if config.ENABLE_VOICE else asyncio.sleep(0)
+    voice_assistant, neo_success, guardian_tools = await asyncio.gather(
+        voice_init, initialize_neo_wallet(), _build_guardian_tools()
+    )
+
+    portfolio_task = None
     if neo_success:
         print("✅ Neo wallet integration successful!")
-        # Get initial portfolio status
-        portfolio = await get_neo_portfolio()
-        print(f"📊 Portfolio Status:\n{portfolio}")
+        # Fetch initial portfolio status while the agents are being built
+        portfolio_task = asyncio.create_task(get_neo_portfolio())
     else:
         print("⚠️ Neo wallet integration failed - continuing with limited functionality")
 
-    # 2. Setup Tools
-    market_tool = MarketAnalyticsTool()
-    rec_tool = TradeRecommendationTool()
-    research_tool = Web3ResearchTool()
-
-    # 3. Create Agent
+    # 2. Create Agent
     if not config.GEMINI_API_KEY:
          print("[ERROR] GEMINI_API_KEY not set. Please add it to .env.")
+         if portfolio_task: portfolio_task.cancel()
+         await close_rpc_session()
+         stop_logging(log_listener)
          return
 
     llm_provider = "gemini"
     model_name = "gemini-2.5-flash"
     api_key = config.GEMINI_API_KEY
 
-    # Helper for routing
-    router_llm = ChatBot(llm_provider=llm_provider, model_name=model_name, api_key=api_key)
+    # One client shared by the router, the guardian and every manager
+    shared_llm = ChatBot(
+        llm_provider=llm_provider,
+        model_name=model_name,
+        api_key=api_key,
+        max_tokens=8192
+    )
+    router_llm = shared_llm
 
     # Specialized Agents
-    neofs_mgr = NeoFSManager(llm_provider=llm_provider, model_name=model_name)
-    turnkey_mgr = TurnkeyWalletManager(llm_provider=llm_provider, model_name=model_name)
-    # market_mgr = MarketAnalyst(llm_provider=llm_provider, model_name=model_name) # Assuming this tool exists or was removed. 
-    # Based on previous file reads, MarketAnalyst was imported. If it's valid, keep it. 
-    # But wait, did I verify MarketAnalyst? It was in imports. Let's keep it consistent with previous main.py
-    market_mgr = MarketAnalyst(llm_provider=llm_provider, model_name=model_name)
+    # Imported and built on first use, so a session that never routes to them skips the cost
+    def build_neofs():
+        from src.tools.neofs import NeoFSManager
+        return NeoFSManager(llm=shared_llm)
+
+    def build_turnkey():
+        from src.tools.turnkey import TurnkeyWalletManager
+        return TurnkeyWalletManager(llm=shared_llm)
+
+    def build_market():
+        from src.tools.market import MarketAnalyst
+        return MarketAnalyst(llm=shared_llm)
+
+    neofs_mgr = _Lazy(build_neofs)
+    turnkey_mgr = _Lazy(build_turnkey)
+    market_mgr = _Lazy(build_market)
 
     guardian = FlowChainAgent(
-        llm=ChatBot(
-            llm_provider=llm_provider, 
-            model_name=model_name, 
-            api_key=api_key,
-            max_tokens=8192
-        ),
-        available_tools=ToolManager([market_tool, rec_tool, research_tool]) 
+        llm=shared_llm,
+        available_tools=guardian_tools
     )
 
     print(f"🤖 Agent {guardian.name} initialized with Neo wallet integration and SpoonOS tools.")
+    # Resolve and reach Gemini while the user is still reading the banner
+    warmup_task = asyncio.create_task(_warm_up_llm())
+
+    if portfolio_task:
+        print(f"📊 Portfolio Status:\n{await portfolio_task}")
 
     # 3. Interactive Loop
-    # Initialize voice if enabled
-    voice_assistant = None
-    if config.ENABLE_VOICE:
-        try:
-            print("Initializing Voice Assistant...")
-            voice_assistant = VoiceAssistant()
-            print("Voice Assistant Ready.")
-        except Exception as e:
-            print(f"Failed to initialize voice: {e}")
+    try:
+        await interactive_loop(guardian, neofs_mgr, turnkey_mgr, market_mgr, router_llm, voice_assistant)
+    finally:
+        # A quick quit can beat the warm-up; don't leave it pending when the loop closes
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await close_rpc_session()
+        if voice_assistant:
+            voice_assistant.close()
+        stop_logging(log_listener)
 
-    await interactive_loop(guardian, neofs_mgr, turnkey_mgr, market_mgr, router_llm, voice_assistant)
+async def _finish_speaking(speaking):
+    """Waits for a pending utterance, reporting rather than raising playback errors."""
+    if speaking is None:
+        return
+    try:
+        await speaking
+    except Exception as e:
+        print(f"FlowChain [Voice Error]: {e}")
 
 async def interactive_loop(guardian, neofs, turnkey, market, router_llm, voice=None):
     """Interaction loop with routing."""
@@ -160,63 +296,53 @@ async def interactive_loop(guardian, neofs, turnkey, market, router_llm, voice=N
     if voice:
         print("🎤 Voice Mode Enabled. Speak to interact.")
     print("------------------------------------------------")
+    loop = asyncio.get_running_loop()
+    # Playback of the previous reply runs in the background; it is only awaited
+    # right before the mic reopens so we never record our own voice.
+    speaking = None
+    stdin = None if voice else _StdinReader.create(loop)
     
     while True:
         try:
             user_msg = ""
             if voice:
-                user_msg = voice.listen()
+                await _finish_speaking(speaking)
+                speaking = None
+                user_msg = await loop.run_in_executor(_VOICE_POOL, voice.listen)
                 if not user_msg: continue
-                if user_msg.lower() in ["exit", "quit", "stop", "goodbye"]:
-                     print("Exiting...")
-                     break
             else:
                 print("You: ", end="", flush=True)
-                user_msg = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
+                if stdin:
+                    user_msg = await stdin.readline()
+                else:
+                    user_msg = await loop.run_in_executor(_IO_POOL, sys.stdin.readline)
                 if not user_msg: break
             
             user_msg = user_msg.strip()
-            if user_msg.lower() in ["exit", "quit"]: break
+            msg_lower = user_msg.lower()
+            if voice and msg_lower in _VOICE_EXIT_WORDS:
+                print("Exiting...")
+                break
+            if msg_lower in _EXIT_WORDS: break
             if not user_msg: continue
 
-            print(f"You said: {user_msg}") # Feedback in CLI
+            # One write per turn; typed input is already on screen, only echo what was heard
+            print(f"You said: {user_msg}\n...Thinking..." if voice else "...Thinking...")
 
-            # Routing
-            print("...Thinking...")
-            category = await get_intent_router(router_llm, user_msg)
-            print(f"[Debug] Intent detected: {category}")
-            
             response = ""
             try:
-                if category == "neofs":
-                    response = await neofs.run(user_msg)
-                elif category == "turnkey":
-                    response = await turnkey.run(user_msg)
-                elif category == "market":
-                    if "eth" in user_msg.lower(): token = "ETH"
-                    elif "btc" in user_msg.lower(): token = "BTC"
-                    elif "neo" in user_msg.lower(): token = "NEO"
-                    else: token = "BTC"
-                    response = await market.analyze_token(token)
-                else:
-                    response = await guardian.run(user_msg)
+                response = await _handle(user_msg, router_llm, guardian, neofs, turnkey, market)
 
                 print(f"FlowChain: {response}")
                 
                 if voice:
-                    # Simple mood detection
-                    response_lower = response.lower()
-                    mood = "neutral"
-                    if any(w in response_lower for w in ["profit", "gain", "excellent", "secure", "good", "great"]):
-                        mood = "happy"
-                    elif any(w in response_lower for w in ["loss", "drop", "critical", "alert", "warning", "regret", "shit", "error", "failed"]):
-                        mood = "serious"
-                    voice.speak(response, mood=mood)
+                    mood = detect_mood(response)
+                    speaking = loop.run_in_executor(_VOICE_POOL, functools.partial(voice.speak, response, mood=mood))
                     
             except Exception as e:
                 print(f"FlowChain [Error]: {e}")
                 error_msg = f"I'm sorry, I encountered an error executing that request: {str(e)}"
-                if voice: voice.speak(error_msg)
+                if voice: speaking = loop.run_in_executor(_VOICE_POOL, voice.speak, error_msg)
 
         except EOFError:
             break
@@ -224,5 +350,9 @@ async def interactive_loop(guardian, neofs, turnkey, market, router_llm, voice=N
             print("\nShutting down...")
             break
 
+    if stdin: stdin.close()
+    await _finish_speaking(speaking)
+
 if __name__ == "__main__":
+    install_fast_event_loop()
     asyncio.run(main())
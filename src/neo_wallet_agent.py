@@ -3,29 +3,146 @@ Neo Wallet Agent Integration for FlowChain
 Integrates Neo N3 blockchain wallet functionality with the FlowChain agent system
 """
 
-import os
 import asyncio
-import json
-import requests
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+import os
+import re
+import sys
+import time
+import aiohttp
+from typing import Dict, Optional
+
+# Add project root to sys.path so `python src/neo_wallet_agent.py` works as well as `-m`
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
-# Load environment variables
-load_dotenv()
+from src import config
+from src import fastjson
+from src.cache import TTLCache
+from src.resilience import CircuitBreaker, retry_async
 
 # Neo asset script hashes (mainnet/testnet)
 NEO_SCRIPT_HASH = "0xef4073a0f2b305a38ec4050e4d3d28bc40ea63f5"
 GAS_SCRIPT_HASH = "0xd2a4cff31913016155e38e474a2c06d08be276cf"
 
-# Get config values directly from environment
-NEO_WIF = os.getenv("NEO_WIF")
-NEO_ADDRESS = os.getenv("NEO_ADDRESS", "")
-NEO_RPC_URL = os.getenv("NEO_RPC_URL", "https://testnet1.neo.coz.io:443")
-TURNKEY_SIGN_WITH = os.getenv("TURNKEY_SIGN_WITH")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Asset hash -> (symbol, decimals divisor); NEO is indivisible, GAS has 8 decimals
+_TRACKED_ASSETS = {
+    NEO_SCRIPT_HASH: ("NEO", None),
+    GAS_SCRIPT_HASH: ("GAS", 100000000),
+}
+
+# Command keywords; one scan of the command collects every group that occurs in it.
+# "balance"/"how much" also ask for an amount, but they already select the summary.
+_COMMAND_RE = re.compile(
+    r"(?P<summary>balance|holdings|how much|wallet|portfolio|status)"
+    r"|(?P<amount>have)|(?P<neo>neo)|(?P<gas>gas)|(?P<address>address)",
+    re.IGNORECASE,
+)
+
+# Config values (src.config has already loaded .env)
+NEO_WIF = config.NEO_WIF
+NEO_ADDRESS = config.NEO_ADDRESS
+NEO_RPC_URL = config.NEO_RPC_URL
+TURNKEY_SIGN_WITH = config.TURNKEY_SIGN_WITH
+GEMINI_API_KEY = config.GEMINI_API_KEY
+
+
+# Everything an RPC round-trip or reply parsing can raise; anything else is a bug and propagates
+RPC_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError, ValueError, KeyError, TypeError)
+
+# One keep-alive session for every RPC call, created on first use inside the running loop.
+# A session is bound to its loop, so a later asyncio.run() gets a new one.
+_rpc_session: Optional[aiohttp.ClientSession] = None
+_rpc_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_rpc_session() -> aiohttp.ClientSession:
+    global _rpc_session, _rpc_session_loop
+    loop = asyncio.get_running_loop()
+    if _rpc_session is None or _rpc_session.closed or _rpc_session_loop is not loop:
+        # A session left over from a finished loop cannot be closed from this one; drop it
+        _rpc_session_loop = loop
+        _rpc_session = aiohttp.ClientSession(
+            # The RPC host never changes; resolve it every 5 minutes instead of aiohttp's 10 s
+            connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10),
+            json_serialize=fastjson.dumps,
+        )
+    return _rpc_session
+
+
+async def close_rpc_session():
+    """Close the shared RPC session (call once on shutdown)"""
+    global _rpc_session, _rpc_session_loop
+    if (_rpc_session is not None and not _rpc_session.closed
+            and _rpc_session_loop is asyncio.get_running_loop()):
+        await _rpc_session.close()
+    _rpc_session = None
+    _rpc_session_loop = None
+
+
+# One breaker per RPC endpoint, so a dead node is not hammered on every balance lookup
+_RPC_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+class RPCStatusError(aiohttp.ClientError):
+    """The node answered 429 or 5xx; worth another try"""
+
+
+async def _post_rpc(rpc_url, payload):
+    """POST a JSON-RPC request, retrying connection errors and 429/5xx replies with jittered backoff"""
+    session = _get_rpc_session()
+    breaker = _RPC_BREAKERS.get(rpc_url)
+    if breaker is None:
+        breaker = _RPC_BREAKERS[rpc_url] = CircuitBreaker("Neo RPC")
+
+    async def post():
+        async with session.post(rpc_url, json=payload) as response:
+            if response.status == 429 or response.status >= 500:
+                raise RPCStatusError(f"RPC returned {response.status}")
+            return fastjson.loads(await response.read())
 
+    # Every call made through here is a read (balances, block height, version), so retrying is safe
+    return await retry_async(lambda: breaker.call(post))
 
-def get_neo_balance_direct(address=None, rpc_url=None):
+
+async def neo_rpc_batch(calls, rpc_url=None):
+    """
+    Send several JSON-RPC calls in one POST (JSON-RPC 2.0 batch).
+    `calls` is a list of (method, params); returns {index: response object} so callers
+    can read "result" or "error" per call.
+    """
+    if rpc_url is None:
+        rpc_url = NEO_RPC_URL
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    data = await _post_rpc(rpc_url, payload)
+    if isinstance(data, dict):
+        # Nodes that reject batches answer with a single error object
+        raise RuntimeError(data.get("error", {}).get("message", "batch request rejected"))
+    return {item.get("id"): item for item in data}
+
+
+def _parse_balances(data):
+    """Turn a getnep17balances response object into {"NEO": int, "GAS": float}"""
+    balances = {"NEO": 0, "GAS": 0.0}
+    
+    if "result" in data and "balance" in data["result"]:
+        for item in data["result"]["balance"]:
+            asset = _TRACKED_ASSETS.get(item.get("assethash", ""))
+            if asset is None:
+                # Other NEP-17 tokens are skipped without parsing their amounts
+                continue
+            symbol, divisor = asset
+            amount = int(item.get("amount", "0"))
+            balances[symbol] = amount if divisor is None else amount / divisor
+    
+    return balances
+
+
+async def get_neo_balance_direct(address=None, rpc_url=None):
     """Get Neo wallet balance using direct RPC call"""
     if address is None:
         address = NEO_ADDRESS
@@ -40,26 +157,15 @@ def get_neo_balance_direct(address=None, rpc_url=None):
     }
     
     try:
-        response = requests.post(rpc_url, json=payload, timeout=10)
-        data = response.json()
-        
-        balances = {"NEO": 0, "GAS": 0.0}
-        
-        if "result" in data and "balance" in data["result"]:
-            for item in data["result"]["balance"]:
-                asset_hash = item.get("assethash", "")
-                amount = int(item.get("amount", "0"))
-                
-                if asset_hash == NEO_SCRIPT_HASH:
-                    balances["NEO"] = amount
-                elif asset_hash == GAS_SCRIPT_HASH:
-                    balances["GAS"] = amount / 100000000
-        
-        return balances
-    except Exception as e:
+        return _parse_balances(await _post_rpc(rpc_url, payload))
+    except RPC_ERRORS as e:
         return {"error": str(e), "NEO": 0, "GAS": 0}
 
 
+# Balance lookups within one user turn (summary, then a follow-up branch) share one RPC call
+BALANCE_CACHE_TTL = 5.0
+
+
 class FlowChainNeoIntegration:
     """Integration class to connect Neo wallet with FlowChain agent"""
     
@@ -69,6 +175,17 @@ class FlowChainNeoIntegration:
         self.has_private_key = bool(NEO_WIF)
         self._initialized = False
         self._cached_balance = None
+        self._balance_ts = 0.0
+        self.block_height = None
+        # The address never changes, so the summary layout is built once
+        self._summary_template = (
+            "🏦 **Neo Wallet Status**\n"
+            f"📍 Address: {self.address[:8]}...{self.address[-6:]}\n"
+            "💰 NEO: {neo}\n"
+            "⛽ GAS: {gas:.8f}\n"
+            "🔗 Network: {network}\n"
+            f"🔐 Private Key: {'✅ Loaded' if self.has_private_key else '❌ Not loaded'}"
+        )
     
     async def initialize(self, use_turnkey=False):
         """Initialize the Neo wallet integration"""
@@ -77,23 +194,46 @@ class FlowChainNeoIntegration:
             print(f"📍 Wallet Address: {self.address}")
             print(f"🔗 RPC Endpoint: {self.rpc_url}")
             
-            balance = get_neo_balance_direct(self.address, self.rpc_url)
+            # Balance and chain height in a single round-trip
+            try:
+                replies = await neo_rpc_batch(
+                    [("getnep17balances", [self.address]), ("getblockcount", [])],
+                    self.rpc_url,
+                )
+                balance = _parse_balances(replies.get(0, {}))
+                self.block_height = replies.get(1, {}).get("result")
+            except RPC_ERRORS:
+                balance = await get_neo_balance_direct(self.address, self.rpc_url)
             
-            self._cached_balance = balance
+            self._store_balance(balance)
             self._initialized = True
             print(f"✅ Neo wallet connected successfully!")
             print(f"💰 Balance: {balance.get('GAS', 0)} GAS, {balance.get('NEO', 0)} NEO")
+            if self.block_height is not None:
+                print(f"⛓️ Block height: {self.block_height}")
             return True
                 
         except Exception as e:
             print(f"❌ Neo integration failed: {e}")
             return False
     
+    def _store_balance(self, balance):
+        self._cached_balance = balance
+        # Failed lookups are kept for display but never served from cache
+        self._balance_ts = 0.0 if "error" in balance else time.monotonic()
+    
+    async def _balance_cached(self, ttl=BALANCE_CACHE_TTL):
+        """Balance from the last lookup if it is younger than `ttl` seconds, else a fresh RPC call"""
+        if self._cached_balance and time.monotonic() - self._balance_ts < ttl:
+            return self._cached_balance
+        balance = await get_neo_balance_direct(self.address, self.rpc_url)
+        self._store_balance(balance)
+        return balance
+    
     async def get_wallet_status(self):
         """Get comprehensive wallet status"""
         try:
-            balance = get_neo_balance_direct(self.address, self.rpc_url)
-            self._cached_balance = balance
+            balance = await self._balance_cached()
             
             return {
                 "status": "connected",
@@ -101,6 +241,7 @@ class FlowChainNeoIntegration:
                 "balance": balance,
                 "has_private_key": self.has_private_key,
                 "network": "testnet" if "testnet" in self.rpc_url else "mainnet",
+                "block_height": self.block_height,
                 "rpc_url": self.rpc_url
             }
         except Exception as e:
@@ -116,16 +257,11 @@ class FlowChainNeoIntegration:
             
             if status["status"] == "connected":
                 balance = status["balance"]
-                neo_balance = balance.get('NEO', 0)
-                gas_balance = balance.get('GAS', 0)
-                
-                summary = "🏦 **Neo Wallet Status**\n"
-                summary += f"📍 Address: {self.address[:8]}...{self.address[-6:]}\n"
-                summary += f"💰 NEO: {neo_balance}\n"
-                summary += f"⛽ GAS: {gas_balance:.8f}\n"
-                summary += f"🔗 Network: {status.get('network', 'testnet')}\n"
-                summary += f"🔐 Private Key: {'✅ Loaded' if self.has_private_key else '❌ Not loaded'}"
-                return summary
+                return self._summary_template.format(
+                    neo=balance.get('NEO', 0),
+                    gas=balance.get('GAS', 0),
+                    network=status.get('network', 'testnet'),
+                )
             else:
                 return f"❌ Neo wallet error: {status.get('error', 'Unknown error')}"
                 
@@ -134,27 +270,27 @@ class FlowChainNeoIntegration:
     
     async def get_balance(self):
         """Get current wallet balance"""
-        return get_neo_balance_direct(self.address, self.rpc_url)
+        return await self._balance_cached()
     
     async def execute_neo_command(self, command):
         """Execute a Neo wallet command"""
         if not self._initialized:
             await self.initialize()
         
-        command_lower = command.lower()
+        hits = {match.lastgroup for match in _COMMAND_RE.finditer(command)}
         
-        if any(word in command_lower for word in ["balance", "holdings", "how much", "wallet", "portfolio", "status"]):
+        if "summary" in hits:
             return await self.get_portfolio_summary()
         
-        if "neo" in command_lower and any(word in command_lower for word in ["balance", "how much", "have"]):
+        if "amount" in hits and "neo" in hits:
             balance = await self.get_balance()
             return f"💰 You have {balance.get('NEO', 0)} NEO"
         
-        if "gas" in command_lower and any(word in command_lower for word in ["balance", "how much", "have"]):
+        if "amount" in hits and "gas" in hits:
             balance = await self.get_balance()
             return f"⛽ You have {balance.get('GAS', 0):.8f} GAS"
         
-        if any(word in command_lower for word in ["address", "wallet address", "my address"]):
+        if "address" in hits:
             return f"📍 Your Neo wallet address is: {self.address}"
         
         balance = await self.get_balance()
@@ -164,6 +300,10 @@ class FlowChainNeoIntegration:
 # Global instance
 neo_integration = FlowChainNeoIntegration()
 
+# Repeated "balance?" questions within a few seconds reuse the last summary
+PORTFOLIO_CACHE_TTL = 10.0
+_portfolio_cache = TTLCache(ttl=PORTFOLIO_CACHE_TTL)
+
 
 async def initialize_neo_wallet(use_turnkey=False):
     """Initialize Neo wallet integration"""
@@ -172,7 +312,7 @@ async def initialize_neo_wallet(use_turnkey=False):
 
 async def get_neo_portfolio():
     """Get Neo portfolio summary"""
-    return await neo_integration.get_portfolio_summary()
+    return await _portfolio_cache.get_or_set("portfolio", neo_integration.get_portfolio_summary)
 
 
 async def get_neo_balance():
@@ -209,8 +349,11 @@ async def demo_neo_wallet():
             response = await neo_integration.execute_neo_command(cmd)
             print(f"🤖 Agent: {response}")
     
+    await close_rpc_session()
     print("\n✅ Demo completed!")
 
 
 if __name__ == "__main__":
+    from src.eventloop import install_fast_event_loop
+    install_fast_event_loop()
     asyncio.run(demo_neo_wallet())
@@ -0,0 +1,91 @@
+"""
+Retry and circuit-breaker helpers for FlowChain
+Rides out transient Gemini / Neo RPC failures without hammering an endpoint that is down.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Tuple, Type
+
+import aiohttp
+
+# Failures worth another try: the request may never have reached the server
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream that has failed too often recently"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `fail_max` consecutive failures and rejects calls for `reset_timeout` seconds.
+    After that one trial call is let through (concurrent callers are still rejected while it
+    runs); success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self._clock = clock
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        if self._opened_at is None:
+            return False
+        return self._clock() - self._opened_at < self.reset_timeout
+
+    async def call(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        trial = False
+        if self._opened_at is not None:
+            if self.is_open or self._trial_running:
+                raise CircuitOpenError(f"{self.name} is unavailable, retrying in a few seconds")
+            self._trial_running = trial = True
+        try:
+            result = await factory()
+        except Exception:
+            self._failures += 1
+            if trial or self._failures >= self.fail_max:
+                self._opened_at = self._clock()
+            raise
+        finally:
+            if trial:
+                self._trial_running = False
+        self._failures = 0
+        self._opened_at = None
+        return result
+
+
+def backoff_delays(attempts: int = 3, initial: float = 0.2, max_delay: float = 4.0):
+    """Full-jitter exponential delays to sleep between `attempts` tries (attempts - 1 values)"""
+    for attempt in range(attempts - 1):
+        yield random.uniform(0, min(max_delay, initial * 2 ** attempt))
+
+
+async def retry_async(
+    factory: Callable[[], Awaitable[Any]],
+    attempts: int = 3,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+) -> Any:
+    """
+    Await `factory()` up to `attempts` times with jittered backoff between tries.
+    Only errors in `retry_on` are retried, so deterministic failures surface at once.
+    Only use for idempotent calls; a CircuitOpenError is never retried.
+    """
+    delays = backoff_delays(attempts)
+    while True:
+        try:
+            return await factory()
+        except CircuitOpenError:
+            raise
+        except retry_on:
+            delay = next(delays, None)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
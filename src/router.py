@@ -0,0 +1,80 @@
+"""
+Intent routing shared by the CLI and the web server
+Keywords, the route cache and the local classifier settle most messages; only the rest cost a Gemini call.
+"""
+
+import asyncio
+from typing import Optional
+
+from spoon_ai.chat import ChatBot
+from spoon_ai.schema import Message
+
+from src import config
+from src.cache import TTLCache, normalize_query
+from src.intent import (
+    classify_local, match_intent, parse_category,
+    LLM_FALLBACK_MIN_WORDS, ROUTER_INSTRUCTIONS, ROUTER_MAX_CHARS,
+)
+from src.resilience import TRANSIENT_ERRORS, CircuitBreaker, retry_async
+
+# Repeat questions skip the router LLM; MarketAnalyst caches its own analyses
+ROUTE_CACHE = TTLCache(ttl=300.0, maxsize=512)
+
+# Caps in-flight Gemini requests across the router, guardian and managers.
+# Created on first use inside the running loop; a later asyncio.run() gets a new one.
+_llm_sem: Optional[asyncio.Semaphore] = None
+_llm_sem_loop: Optional[asyncio.AbstractEventLoop] = None
+# Wraps the router's own Gemini call only; agent runs also fail on tool and wallet errors
+LLM_BREAKER = CircuitBreaker("Gemini")
+
+# Built once and reused for every routed query
+_ROUTER_PROMPT = Message(role="system", content=ROUTER_INSTRUCTIONS)
+
+
+def llm_semaphore() -> asyncio.Semaphore:
+    """The LLM concurrency cap for the running loop."""
+    global _llm_sem, _llm_sem_loop
+    loop = asyncio.get_running_loop()
+    if _llm_sem is None or _llm_sem_loop is not loop:
+        _llm_sem_loop = loop
+        _llm_sem = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+    return _llm_sem
+
+
+async def get_intent_router(llm: ChatBot, query: str) -> str:
+    """Classifies the intent of the user query."""
+    # Keywords settle most requests without a network call
+    category = match_intent(query)
+    if category:
+        return category
+    if len(query.split()) < LLM_FALLBACK_MIN_WORDS:
+        return "general"
+    cache_key = normalize_query(query)
+    category = ROUTE_CACHE.get(cache_key)
+    if category:
+        return category
+    # A confident local classification skips the network round-trip
+    category = classify_local(query)
+    if category:
+        return category
+
+    async def classify():
+        async with llm_semaphore():
+            return await llm.chat([
+                _ROUTER_PROMPT,
+                Message(role="user", content=query[:ROUTER_MAX_CHARS])
+            ])
+
+    try:
+        # Classification has no side effects, so transient network failures are retried
+        response = await retry_async(lambda: LLM_BREAKER.call(classify), retry_on=TRANSIENT_ERRORS)
+    except Exception as e:
+        print(f"[Router] LLM classification failed, using general: {e}")
+        return "general"
+    try:
+        category = parse_category(response.content)
+    except ValueError as e:
+        print(f"[Router] {e}")
+        return "general"
+    ROUTE_CACHE.set(cache_key, category)
+    return category
@@ -0,0 +1,25 @@
+"""
+SpoonOS SDK compatibility patches
+Applied once per process, however many entrypoints (CLI, server, tests) import them.
+"""
+
+from spoon_ai.tools import ToolManager
+
+
+def patch_tool_manager():
+    """Let ToolManager accept the empty/field-dict init the current SDK Pydantic behavior passes it."""
+    if getattr(ToolManager.__init__, "_flowchain_patched", False):
+        return
+
+    original_init = ToolManager.__init__
+
+    def patched_init(self, tools=None):
+        if tools is None or (isinstance(tools, dict) and 'name' in tools):
+            self.tools = []
+            self.tool_map = {}
+            self.indexed = False
+            return
+        return original_init(self, tools)
+
+    patched_init._flowchain_patched = True
+    ToolManager.__init__ = patched_init
@@ -4,22 +4,34 @@ Handles WebSocket connections for real-time voice/text interaction.
 """
 
 import asyncio
-import json
+import hashlib
+import logging
 import os
 import sys
-from typing import Optional
+import traceback
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from contextlib import asynccontextmanager
 
 # Add project root to sys.path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
-from dotenv import load_dotenv
 from src import config
+from src.sdk_patch import patch_tool_manager
+from src.intent import detect_mood, match_tokens
+from src.router import get_intent_router
+from src import fastjson
+from src.cache import TTLCache
+from src.logsetup import configure_logging, stop_logging
 
 # Tools
 from src.tools.market_tool import MarketAnalyticsTool
@@ -30,37 +42,26 @@ from src.tools.turnkey import TurnkeyWalletManager
 from src.tools.market import MarketAnalyst
 
 if config.ENABLE_VOICE:
-    from src.voice import VoiceAssistant
+    from src.voice import VoiceAssistant, split_sentences
 
 # SDK
 from spoon_ai.agents.toolcall import ToolCallAgent
 from spoon_ai.tools import ToolManager
 from spoon_ai.chat import ChatBot
-from spoon_ai.schema import Message
 
-load_dotenv()
-
-# --- Monkeypatch ToolManager (from main.py) ---
-original_init = ToolManager.__init__
-def patched_init(self, tools=None):
-    if tools is None or (isinstance(tools, dict) and 'name' in tools):
-        self.tools = []
-        self.tool_map = {}
-        self.indexed = False
-        return
-    return original_init(self, tools)
-ToolManager.__init__ = patched_init
-# -----------------------------------------------
+# Required for compatibility with current SDK Pydantic behavior
+patch_tool_manager()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize agent on server startup"""
-    import warnings
-    import logging
+    # Runs in every worker process, so each one prints its tools' status lines
+    log_listener = configure_logging()
     logging.getLogger("spoon_ai.llm.manager").setLevel(logging.ERROR)
     await initialize_agent()
     print("✅ FlowChain agent initialized and ready")
     yield
+    stop_logging(log_listener)
 
 app = FastAPI(lifespan=lifespan)
 
@@ -76,28 +77,91 @@ app.add_middleware(
 )
 
 # Add security headers for microphone access
-from starlette.middleware.base import BaseHTTPMiddleware
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response = await call_next(request)
-        # Allow microphone access on localhost
-        response.headers["Permissions-Policy"] = "microphone=*"
-        response.headers["Feature-Policy"] = "microphone *"
-        return response
+class SecurityHeadersMiddleware:
+    """
+    Pure ASGI middleware: appends the headers to the response start message in place,
+    without BaseHTTPMiddleware's per-request task and response re-wrapping.
+    """
+
+    # Allow microphone access on localhost
+    HEADERS = [
+        (b"permissions-policy", b"microphone=*"),
+        (b"feature-policy", b"microphone *"),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + self.HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 app.add_middleware(SecurityHeadersMiddleware)
 
+# HTML/CSS/JS compress 4-10x; tiny responses aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Asset names are not fingerprinted, so cache for a day rather than `immutable`.
+# Pages, CSS and JS change with every deploy and only get a short window.
+ASSET_CACHE_CONTROL = "public, max-age=86400"
+FRONTEND_CACHE_CONTROL = "public, max-age=300"
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that adds a Cache-Control header to every file it serves"""
+
+    def __init__(self, *args, cache_control: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
 # Serve static files from frontend directory
 frontend_path = os.path.join(os.path.dirname(__file__), '..', 'frontend')
 if os.path.exists(frontend_path):
     # Serve static assets
     assets_path = os.path.join(frontend_path, "assets")
     if os.path.exists(assets_path):
-        app.mount("/assets", StaticFiles(directory=assets_path), name="assets")
+        app.mount("/assets", CachedStaticFiles(directory=assets_path, cache_control=ASSET_CACHE_CONTROL), name="assets")
     
     # Serve CSS and JS files
-    app.mount("/static", StaticFiles(directory=frontend_path), name="static")
+    app.mount("/static", CachedStaticFiles(directory=frontend_path, cache_control=FRONTEND_CACHE_CONTROL), name="static")
+
+def _scan_frontend(root):
+    """Relative paths (with '/') of the .html/.css/.js files under root, collected once at import"""
+    files = set()
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(('.html', '.css', '.js')):
+                files.add(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, '/'))
+    return frozenset(files)
+
+# Set lookups replace per-request os.path.exists calls (and cannot resolve '..' paths)
+FRONTEND_FILES = _scan_frontend(frontend_path)
+
+# index.html is the SPA entry and fallback for every unknown route; keep it in memory
+INDEX_HTML = None
+INDEX_ETAG = None
+if "index.html" in FRONTEND_FILES:
+    with open(os.path.join(frontend_path, "index.html"), "rb") as f:
+        INDEX_HTML = f.read()
+    # Not a security hash; usedforsecurity=False keeps it available on FIPS hosts
+    INDEX_ETAG = '"' + hashlib.md5(INDEX_HTML, usedforsecurity=False).hexdigest() + '"'
+
+def _index_response(request: Request) -> Response:
+    if request.headers.get("if-none-match") == INDEX_ETAG:
+        return Response(status_code=304, headers={"ETag": INDEX_ETAG})
+    return Response(content=INDEX_HTML, media_type="text/html", headers={"ETag": INDEX_ETAG})
 
 class FlowChainAgent(ToolCallAgent):
     name: str = "flowchain"
@@ -162,26 +226,43 @@ market: Optional[MarketAnalyst] = None
 router_llm: Optional[ChatBot] = None
 voice_assistant: Optional[VoiceAssistant] = None
 
-async def get_intent_router(llm: ChatBot, query: str) -> str:
-    """Classifies the intent of the user query."""
-    system_prompt = """
-    You are a query router. Classify the user's request into one of these categories:
-    - 'neofs': Storage, uploading, downloading, files.
-    - 'turnkey': Wallet creation, signing, keys, security, batch operations.
-    - 'market': Price analysis, charts, trends, buy/sell advice.
-    - 'general': Everything else (chat, specific NEO operations if not covered above).
-    
-    Respond with ONLY the category name in JSON format: {"category": "..."}
+# Routing (and its cache) lives in src.router, shared with the CLI. Guardian replies
+# are not cached: the demo flow depends on conversation history.
+
+# ElevenLabs calls block for a second or more; keep them off the event loop and out of
+# the default executor so several clients can be synthesized for at once
+TTS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="flowchain-tts")
+# Synthesized clips per (sentence, mood); mood picks the voice settings, and scripted demo
+# lines repeat word for word across sessions
+AUDIO_CACHE = TTLCache(ttl=3600.0, maxsize=256)
+# Clips being synthesized, keyed like AUDIO_CACHE; clients asking for the same sentence
+# at once share one ElevenLabs request instead of each queueing for a TTS_POOL worker
+_AUDIO_INFLIGHT: Dict[Tuple[str, str], asyncio.Future] = {}
+
+async def run_category(category: str, content: str) -> str:
+    """Runs the agent responsible for the category."""
+    if category == "neofs":
+        return await neofs.run(content)
+    elif category == "turnkey":
+        return await turnkey.run(content)
+    elif category == "market":
+        tokens = match_tokens(content)
+        if len(tokens) > 1:
+            summaries = await market.analyze_tokens(tokens)
+            return " ".join(f"{token}: {summary}" for token, summary in summaries.items())
+        return await market.analyze_token(tokens[0] if tokens else "BTC")
+    else:
+        return await agent.run(content)
+
+async def answer(content: str) -> str:
     """
-    try:
-        response = await llm.chat([
-            Message(role="system", content=system_prompt),
-            Message(role="user", content=query)
-        ])
-        data = json.loads(response.content.strip())
-        return data.get("category", "general")
-    except:
-        return "general"
+    Routes the message and returns the reply.
+    The guardian is not started speculatively here: it is one agent shared by every
+    client, so a cancelled run would leave half a turn in the next client's context.
+    """
+    category = await get_intent_router(router_llm, content)
+    print(f"[Debug] Intent detected: {category}")
+    return await run_category(category, content)
 
 async def initialize_agent():
     """Initialize all agents and tools"""
@@ -204,20 +285,21 @@ async def initialize_agent():
     model_name = "gemini-2.5-flash"
     api_key = config.GEMINI_API_KEY
 
-    # 2. Helper & Specialized Agents
-    router_llm = ChatBot(llm_provider=llm_provider, model_name=model_name, api_key=api_key)
-    neofs = NeoFSManager(llm_provider=llm_provider, model_name=model_name)
-    turnkey = TurnkeyWalletManager(llm_provider=llm_provider, model_name=model_name)
-    market = MarketAnalyst(llm_provider=llm_provider, model_name=model_name)
+    # 2. Helper & Specialized Agents, all on one shared Gemini client
+    shared_llm = ChatBot(
+        llm_provider=llm_provider,
+        model_name=model_name,
+        api_key=api_key,
+        max_tokens=8192
+    )
+    router_llm = shared_llm
+    neofs = NeoFSManager(llm=shared_llm)
+    turnkey = TurnkeyWalletManager(llm=shared_llm)
+    market = MarketAnalyst(llm=shared_llm)
 
     # 3. Main Guardian Agent
     agent = FlowChainAgent(
-        llm=ChatBot(
-            llm_provider=llm_provider, 
-            model_name=model_name, 
-            api_key=api_key,
-            max_tokens=8192
-        ),
+        llm=shared_llm,
         available_tools=ToolManager([market_tool, rec_tool, research_tool]) 
     )
     
@@ -236,34 +318,83 @@ async def initialize_agent():
 
 
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     """Serve the frontend index.html"""
-    index_path = os.path.join(frontend_path, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if INDEX_HTML is not None:
+        return _index_response(request)
     return {"message": "FlowChain API is running"}
 
 @app.get("/{path:path}")
-async def serve_frontend(path: str):
+async def serve_frontend(path: str, request: Request):
     """Serve frontend files"""
-    if path.endswith('.css') or path.endswith('.js'):
-        file_path = os.path.join(frontend_path, path)
-        if os.path.exists(file_path):
-            return FileResponse(file_path)
-    
-    if path.endswith('.html') or path == "":
-        file_path = os.path.join(frontend_path, path if path else "index.html")
-        if os.path.exists(file_path):
-            return FileResponse(file_path)
+    if path == "index.html" and INDEX_HTML is not None:
+        return _index_response(request)
+    if path in FRONTEND_FILES:
+        return FileResponse(os.path.join(frontend_path, path), headers={"Cache-Control": FRONTEND_CACHE_CONTROL})
     
-    index_path = os.path.join(frontend_path, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if INDEX_HTML is not None:
+        return _index_response(request)
     
     return {"error": "File not found"}
 
 
 
+async def send_message(websocket: WebSocket, message: dict):
+    """Sends a JSON text frame, encoded with orjson when available"""
+    await websocket.send_text(fastjson.dumps(message))
+
+async def _synthesize_clip(sentence: str, mood: str) -> Optional[bytes]:
+    audio_bytes = await asyncio.get_running_loop().run_in_executor(
+        TTS_POOL, voice_assistant.generate_audio_bytes, sentence, mood
+    )
+    if audio_bytes:
+        AUDIO_CACHE.set((sentence, mood), audio_bytes)
+    return audio_bytes
+
+async def _stream_audio(websocket: WebSocket, text: str, mood: str) -> bool:
+    """
+    Sends the reply as one binary MP3 frame per sentence, synthesizing the next sentence
+    while the current clip is on the wire, then an "audio_end" JSON frame.
+    Returns False if no audio could be produced.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return False
+
+    async def clip(sentence):
+        key = (sentence, mood)
+        audio_bytes = AUDIO_CACHE.get(key)
+        if audio_bytes is not None:
+            return audio_bytes
+        future = _AUDIO_INFLIGHT.get(key)
+        if future is None:
+            future = asyncio.ensure_future(_synthesize_clip(sentence, mood))
+            _AUDIO_INFLIGHT[key] = future
+            future.add_done_callback(lambda _: _AUDIO_INFLIGHT.pop(key, None))
+        # Dropping our prefetch must not cancel a clip another client is waiting on
+        return await asyncio.shield(future)
+
+    def synthesize(sentence):
+        return asyncio.create_task(clip(sentence))
+
+    sent = False
+    pending = synthesize(sentences[0])
+    try:
+        for next_sentence in sentences[1:] + [None]:
+            audio_bytes = await pending
+            pending = synthesize(next_sentence) if next_sentence else None
+            if audio_bytes:
+                # Raw bytes: no base64 pass and a third less data than a JSON-wrapped clip
+                await websocket.send_bytes(audio_bytes)
+                sent = True
+    finally:
+        if pending:
+            pending.cancel()
+
+    if sent:
+        await send_message(websocket, {"type": "audio_end", "status": "ready"})
+    return sent
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time communication"""
@@ -274,22 +405,31 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         # Send welcome message
-        await websocket.send_json({
+        await send_message(websocket, {
             "type": "status",
             "message": "Connected to FlowChain. Ready to assist.",
             "status": "ready"
         })
         
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
+            # Receive message from client; binary frames go to the JSON parser without a str decode
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            data = frame.get("text")
+            if data is None:
+                data = frame.get("bytes") or b""
             print(f"📥 Raw WebSocket data received: {data[:100]}")
             
             try:
-                message = json.loads(data)
+                message = fastjson.loads(data)
                 print(f"📦 Parsed message: {message}")
-            except json.JSONDecodeError as e:
+            except fastjson.JSONDecodeError as e:
                 print(f"⚠️ JSON decode error: {e}, treating as plain text")
+                message = None
+            if not isinstance(message, dict):
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8", errors="replace")
                 message = {"type": "text", "content": data}
             
             message_type = message.get("type", "text")
@@ -299,81 +439,50 @@ async def websocket_endpoint(websocket: WebSocket):
                 print(f"📨 Received message: {content}")
                 
                 # Send status: processing
-                await websocket.send_json({
+                await send_message(websocket, {
                     "type": "status",
                     "message": "Processing your request...",
                     "status": "processing"
                 })
 
-                msg_lower = content.lower()
-
-
-
                 # Normal Routing & Processing
                 try:
                     print(f"🤖 Routing request...")
-                    category = await get_intent_router(router_llm, content)
-                    print(f"[Debug] Intent detected: {category}")
-                    
-                    if category == "neofs":
-                        response = await neofs.run(content)
-                    elif category == "turnkey":
-                        response = await turnkey.run(content)
-                    elif category == "market":
-                        if "eth" in msg_lower: token = "ETH"
-                        elif "btc" in msg_lower: token = "BTC"
-                        elif "neo" in msg_lower: token = "NEO"
-                        else: token = "BTC"
-                        response = await market.analyze_token(token)
-                    else:
-                        response = await agent.run(content)
+                    response = await answer(content)
 
                     print(f"✅ Agent response: {response[:100]}..." if len(response) > 100 else f"✅ Agent response: {response}")
                     
-                    # Send response text first
-                    await websocket.send_json({
+                    speak = bool(config.ENABLE_VOICE and voice_assistant)
+                    # Send response text first; "audio" tells the client server audio follows
+                    await send_message(websocket, {
                         "type": "response",
                         "message": response,
+                        "audio": speak,
                         "status": "speaking"
                     })
                     
                     # Generate and send audio if enabled
-                    if config.ENABLE_VOICE and voice_assistant:
+                    if speak:
                         print("🎙️ Generating audio...")
                         
-                        response_lower = response.lower()
-                        mood = "neutral"
-                        if any(w in response_lower for w in ["profit", "gain", "excellent", "secure", "good", "great", "done"]):
-                            mood = "happy"
-                        elif any(w in response_lower for w in ["loss", "drop", "critical", "alert", "warning", "regret", "shit", "failed"]):
-                            mood = "serious"
-                            
-                        audio_bytes = voice_assistant.generate_audio_bytes(response, mood=mood)
-                        if audio_bytes:
-                            import base64
-                            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                            await websocket.send_json({
-                                "type": "audio",
-                                "audio": audio_base64,
-                                "status": "ready" # Finished speaking state
-                            })
+                        mood = detect_mood(response)
+                        if await _stream_audio(websocket, response, mood):
                             print("✅ Audio sent to client")
                         else:
-                            await websocket.send_json({
+                            await send_message(websocket, {
                                 "type": "status",
                                 "status": "ready"
                             })
                     else:
-                        await websocket.send_json({
+                        await send_message(websocket, {
                             "type": "status",
                             "status": "ready"
                         })
                 except Exception as e:
                     error_msg = f"Error processing request: {str(e)}"
                     print(f"❌ Error: {error_msg}")
-                    import traceback
                     traceback.print_exc()
-                    await websocket.send_json({
+                    await send_message(websocket, {
                         "type": "error",
                         "message": error_msg,
                         "status": "ready"
@@ -381,7 +490,7 @@ async def websocket_endpoint(websocket: WebSocket):
             
             elif message_type == "ping":
                 # Heartbeat
-                await websocket.send_json({
+                await send_message(websocket, {
                     "type": "pong",
                     "status": "ready"
                 })
@@ -391,18 +500,31 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         print(f"WebSocket error: {e}")
         try:
-            await websocket.send_json({
+            await send_message(websocket, {
                 "type": "error",
                 "message": f"Server error: {str(e)}",
                 "status": "error"
             })
-        except:
+        except Exception:
+            # Socket already closed; nothing left to tell the client (cancellation still propagates)
             pass
 
-if __name__ == "__main__":
+def serve(host: str = "0.0.0.0", port: int = 8000):
+    """Runs the server with uvicorn (shared by `python -m src.server` and run_server.py)"""
     import uvicorn
-    import warnings
-    
+
+    if config.WEB_WORKERS > 1:
+        # Workers are separate processes that import the app themselves and each run
+        # their own lifespan/agent; uvicorn's "auto" loop gives each of them uvloop
+        uvicorn.run("src.server:app", host=host, port=port, workers=config.WEB_WORKERS, log_level="info")
+        return
+
+    # uvicorn's "auto" only knows uvloop; our helper also covers winloop on Windows
+    from src.eventloop import install_fast_event_loop
+    loop = "none" if install_fast_event_loop() else "auto"
+    uvicorn.run(app, host=host, port=port, loop=loop, log_level="info")
+
+if __name__ == "__main__":
     # Suppress deprecation warnings from dependencies
     warnings.filterwarnings("ignore", category=DeprecationWarning)
     
@@ -414,6 +536,6 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    serve()
 
 
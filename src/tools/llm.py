@@ -0,0 +1,11 @@
+"""Shared ChatBot clients for the tool managers, one per provider and model"""
+
+from functools import lru_cache
+
+from spoon_ai.chat import ChatBot
+
+
+@lru_cache(maxsize=8)
+def get_chatbot(llm_provider: str, model_name: str) -> ChatBot:
+    """One ChatBot per (provider, model) for managers built without a caller-supplied llm."""
+    return ChatBot(llm_provider=llm_provider, model_name=model_name)
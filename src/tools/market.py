@@ -1,13 +1,17 @@
 import os
 import asyncio
-import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 
 from spoon_ai.agents.toolcall import ToolCallAgent
 from spoon_ai.tools import ToolManager
 from spoon_ai.chat import ChatBot
 from spoon_ai.schema import Message
 
+from src import config, fastjson
+from src.cache import TTLCache
+from src.resilience import CircuitBreaker, retry_async
+from src.tools.llm import get_chatbot
+
 try:
     from spoon_toolkits.crypto.crypto_powerdata.tools import CryptoPowerDataCEXTool
 except ImportError:
@@ -29,57 +33,145 @@ except ImportError:
             Latest Close: 103.0
             """)
 
+TIMEFRAME = "4h"
+
+# Shared by every MarketAnalyst, keyed by (token, timeframe). The raw PowerData payload is
+# kept apart from the summary so other analyses of the same chart can reuse it.
+_DATA_CACHE = TTLCache(ttl=config.MARKET_TTL_SECONDS, maxsize=256)
+_ANALYSIS_CACHE = TTLCache(ttl=config.MARKET_TTL_SECONDS, maxsize=256)
+# Analyses and PowerData requests in progress, keyed like the caches; an entry is removed
+# when its request finishes, so concurrent callers for a key share one fetch + LLM call
+_ANALYSIS_INFLIGHT: Dict[tuple, asyncio.Future] = {}
+_DATA_INFLIGHT: Dict[tuple, asyncio.Future] = {}
+# PowerData is one upstream for every token; stop calling it while it is down
+_DATA_BREAKER = CircuitBreaker("PowerData")
+# Upper bound on tokens analyzed at once by analyze_tokens (exchange + LLM rate limits)
+MAX_PARALLEL_ANALYSES = 8
+
+# The indicator set never changes, so it is serialized once
+_INDICATORS_CONFIG_JSON = fastjson.dumps({
+    "rsi": [{"timeperiod": 14}],
+    "ema": [{"timeperiod": 20}, {"timeperiod": 50}],
+    "macd": [{"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}],
+})
+
+# Chart data beyond this many characters is cut from the prompt
+_MAX_DATA_CHARS = 2000
+
+def _prompt_data(output) -> str:
+    """PowerData output as prompt text, cut to _MAX_DATA_CHARS without str()-ing it whole first."""
+    if isinstance(output, str):
+        return output[:_MAX_DATA_CHARS]
+    if isinstance(output, bytes):
+        return output[:_MAX_DATA_CHARS].decode("utf-8", "ignore")
+    try:
+        # Compact JSON is shorter than the repr, so more bars fit in the same budget
+        return fastjson.dumps(output)[:_MAX_DATA_CHARS]
+    except (TypeError, ValueError):
+        return str(output)[:_MAX_DATA_CHARS]
+
+# Static instructions go first as the system message so providers can cache the prefix
+# (Anthropic marks it with cache_control, OpenAI/Gemini cache identical prefixes implicitly)
+_ANALYST_SYSTEM_MESSAGE = Message(role="system", content="""You are a crypto analyst. Analyze the chart data for the token you are given.
+
+Provide a concise, spoken-word friendly summary:
+1. Current Trend
+2. Key Support/Resistance
+3. Actionable Signal (Buy/Sell/Wait)
+
+Keep it under 3 sentences suitable for reading out loud (TTS).""")
+
+_DATA_TEMPLATE = "Token: {token}\nTimeframe: {timeframe}\nData: {data}"
+
+async def _single_flight(inflight: Dict[tuple, asyncio.Future], key: tuple, factory):
+    """Awaits the request in progress for `key`, starting `factory()` if there is none."""
+    future = inflight.get(key)
+    # A request left behind by a loop that has since closed will never finish here
+    if future is None or future.get_loop() is not asyncio.get_running_loop():
+        future = asyncio.ensure_future(factory())
+        inflight[key] = future
+        future.add_done_callback(lambda _: inflight.pop(key, None))
+    # A cancelled caller must not cancel the request the others are waiting on
+    return await asyncio.shield(future)
+
 class MarketAnalyst:
     """Manager for Crypto Market Analysis using SpoonAI and PowerData."""
     
-    def __init__(self, llm_provider="openrouter", model_name="openai/gpt-4o"):
-        self.llm = ChatBot(llm_provider=llm_provider, model_name=model_name)
+    def __init__(self, llm_provider="openrouter", model_name="openai/gpt-4o", llm: Optional[ChatBot] = None):
+        # Reuse the caller's ChatBot when given so all agents share one client
+        self.llm = llm or get_chatbot(llm_provider, model_name)
         self.powerdata_tool = CryptoPowerDataCEXTool()
         # We can add more tools here if needed, like the Tavily search if keys present
 
     async def analyze_token(self, token: str) -> str:
-        """Perform a quick technical analysis on a token."""
-        token = token.upper()
-        symbol = f"{token}/USDT"
-        
+        """Perform a quick technical analysis on a token (cached for MARKET_TTL_SECONDS)."""
+        key = (token.upper(), TIMEFRAME)
+        analysis = _ANALYSIS_CACHE.get(key)
+        if analysis is not None:
+            return analysis
+        return await _single_flight(_ANALYSIS_INFLIGHT, key, lambda: self._analyze_and_cache(key))
+
+    async def _analyze_and_cache(self, key: tuple) -> str:
+        analysis, ok = await self._analyze(key[0])
+        # Failures are returned but not cached, so the next request retries
+        if ok:
+            _ANALYSIS_CACHE.set(key, analysis)
+        return analysis
+
+    async def analyze_tokens(self, tokens: Iterable[str]) -> Dict[str, str]:
+        """Analyzes several tokens concurrently; returns {TOKEN: summary} in the given order."""
+        tokens = list(dict.fromkeys(token.upper() for token in tokens))
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_ANALYSES)
+
+        async def bounded(token):
+            async with semaphore:
+                return await self.analyze_token(token)
+
+        summaries = await asyncio.gather(*(bounded(token) for token in tokens))
+        return dict(zip(tokens, summaries))
+
+    async def _fetch_data(self, token: str):
+        """Chart data for the token; concurrent callers for one key share a single request."""
+        key = (token, TIMEFRAME)
+        result = _DATA_CACHE.get(key)
+        if result is not None:
+            return result
+        return await _single_flight(_DATA_INFLIGHT, key, lambda: self._request_data(key))
+
+    async def _request_data(self, key: tuple):
+        token, timeframe = key
+        fetch = lambda: self.powerdata_tool.execute(
+            exchange="binance",
+            symbol=f"{token}/USDT",
+            timeframe=timeframe, # Good default
+            limit=50,
+            indicators_config=_INDICATORS_CONFIG_JSON,
+            use_enhanced=True
+        )
+        # A chart read has no side effects, so transient network failures are retried
+        result = await retry_async(lambda: _DATA_BREAKER.call(fetch))
+        if not result.error:
+            _DATA_CACHE.set(key, result)
+        return result
+
+    async def _analyze(self, token: str):
+        """Returns (text, ok); ok is False when the text is an error message."""
         try:
             # Fetch data (simplified from example)
-            indicators_config = {
-                "rsi": [{"timeperiod": 14}],
-                "ema": [{"timeperiod": 20}, {"timeperiod": 50}],
-                "macd": [{"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}],
-            }
-            
-            result = await self.powerdata_tool.execute(
-                exchange="binance",
-                symbol=symbol,
-                timeframe="4h", # Good default
-                limit=50,
-                indicators_config=json.dumps(indicators_config),
-                use_enhanced=True
-            )
+            result = await self._fetch_data(token)
             
             if result.error:
-                 return f"Could not fetch market data for {token}: {result.error}"
+                 return f"Could not fetch market data for {token}: {result.error}", False
 
             # Summarize with LLM
-            data_str = str(result.output)[:2000] # Truncate for prompt limits
-            
-            prompt = f"""
-            You are a crypto analyst. Analyze the following 4h chart data for {token}.
-            
-            Data: {data_str}
-            
-            Provide a concise, spoken-word friendly summary:
-            1. Current Trend
-            2. Key Support/Resistance
-            3. Actionable Signal (Buy/Sell/Wait)
+            data_str = _prompt_data(result.output)
             
-            Keep it under 3 sentences suitable for reading out loud (TTS).
-            """
+            prompt = _DATA_TEMPLATE.format(token=token, timeframe=TIMEFRAME, data=data_str)
             
-            response = await self.llm.chat([Message(role="user", content=prompt)])
-            return response.content.strip()
+            messages = [_ANALYST_SYSTEM_MESSAGE, Message(role="user", content=prompt)]
+            # Summarizing is stateless, so a dropped connection is simply asked again
+            response = await retry_async(lambda: self.llm.chat(messages))
+            return response.content.strip(), True
             
         except Exception as e:
-            return f"Analysis failed: {str(e)}"
+            return f"Analysis failed: {str(e)}", False
@@ -1,10 +1,16 @@
-import sys
 import os
-import random
-import string
+import asyncio
+import logging
+import secrets
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 
-# Ensure we can import from spoonos_components
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../spoonos_components')))
+from pydantic import Field
+
+from src import config, fastjson
+
+logger = logging.getLogger(__name__)
 
 try:
     from spoon_ai.tools.base import BaseTool
@@ -15,49 +21,109 @@ try:
     from neo3.wallet import Wallet
     HAS_NEO_MAMBA = True
 except ImportError as e:
-    print(f"[Warning] neo-mamba not installed or build failed ({e}). Running in MOCK mode.")
+    logger.warning("neo-mamba not installed or build failed (%s). Running in MOCK mode.", e)
     # Fallback/Mock classes
     HAS_NEO_MAMBA = False
     class Wallet: pass
 
-# Try to import config to check for forced mock mode
-try:
-    from src import config
-except ImportError:
-    # If running standalone or tests, config might not be reachable
-    class MockConfig:
-        USE_MOCK_WALLET = False
-    config = MockConfig()
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+# Starting balances for the demo, and the balances left after mock transfers (not committed)
+MOCK_WALLET_PATH = os.path.join(_PROJECT_ROOT, "mock_wallet.json")
+MOCK_WALLET_STATE_PATH = os.path.join(_PROJECT_ROOT, "mock_wallet.state.json")
+_DEFAULT_MOCK_BALANCES = {"NEO": 100, "GAS": 520.5, "ETH": 4.2}
+
+# Transfers arriving within this window are written to disk together
+_PERSIST_DELAY = 0.5
+_persist_task = None
+# Read-only view of a copy of the balances; rebuilt only after a transfer changes them
+_balance_snapshot = None
+
+@lru_cache(maxsize=1)
+def _mock_balances() -> dict:
+    """The mock wallet, read from disk once and shared by every NeoWalletTool in the process."""
+    for path in (MOCK_WALLET_STATE_PATH, MOCK_WALLET_PATH):
+        try:
+            with open(path, "rb") as f:
+                return fastjson.loads(f.read())
+        except (OSError, ValueError):
+            continue
+    return dict(_DEFAULT_MOCK_BALANCES)
+
+def _mock_balance_snapshot() -> Mapping[str, float]:
+    """Balances as of the last transfer, as a read-only view shared between callers."""
+    global _balance_snapshot
+    if _balance_snapshot is None:
+        _balance_snapshot = MappingProxyType(dict(_mock_balances()))
+    return _balance_snapshot
+
+def _write_mock_balances(data: bytes):
+    tmp_path = MOCK_WALLET_STATE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, MOCK_WALLET_STATE_PATH)
+
+async def _persist_mock_balances():
+    global _persist_task
+    try:
+        await asyncio.sleep(_PERSIST_DELAY)
+    except asyncio.CancelledError:
+        # Loop shutting down; save synchronously rather than lose the last transfers
+        _write_mock_balances(fastjson.dumps_bytes(_mock_balances()))
+        raise
+    finally:
+        # Cleared before the write, so a transfer made meanwhile schedules its own save
+        if _persist_task is asyncio.current_task():
+            _persist_task = None
+    # Snapshot on the loop thread so the writer never sees a half-applied transfer
+    data = fastjson.dumps_bytes(_mock_balances())
+    try:
+        await asyncio.to_thread(_write_mock_balances, data)
+    except OSError as e:
+        logger.warning("Could not save mock wallet: %s", e)
+
+def _schedule_persist():
+    """Saves the mock wallet shortly after a transfer, off the event loop when there is one."""
+    global _persist_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write_mock_balances(fastjson.dumps_bytes(_mock_balances()))
+        return
+    # A task from a loop that has since closed will never run; treat it as absent
+    if _persist_task is None or _persist_task.done() or _persist_task.get_loop() is not loop:
+        _persist_task = loop.create_task(_persist_mock_balances())
+
+_NEO_WALLET_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "command": {
+            "type": "string",
+            "description": "Operation to perform. 'balance' checks funds, 'transfer' sends funds.",
+            "enum": ["balance", "transfer"]
+        },
+        "asset": {
+            "type": "string",
+            "description": "Asset symbol (NEO or GAS). Required for transfer.",
+            "enum": ["NEO", "GAS"]
+        },
+        "amount": {
+            "type": "number",
+            "description": "Amount to transfer. Required for transfer."
+        },
+        "to_address": {
+            "type": "string",
+            "description": "Recipient wallet address. Required for transfer."
+        }
+    },
+    "required": ["command"]
+}
 
 class NeoWalletTool(BaseTool):
     name: str = "neo_wallet_tool"
     description: str = "Interacts with Neo N3 blockchain (Get Balance, Send GAS). Supports mock mode for demos."
     
-    # Define parameters schema
-    parameters: dict = {
-        "type": "object",
-        "properties": {
-            "command": {
-                "type": "string",
-                "description": "Operation to perform. 'balance' checks funds, 'transfer' sends funds.",
-                "enum": ["balance", "transfer"]
-            },
-            "asset": {
-                "type": "string",
-                "description": "Asset symbol (NEO or GAS). Required for transfer.",
-                "enum": ["NEO", "GAS"]
-            },
-            "amount": {
-                "type": "number",
-                "description": "Amount to transfer. Required for transfer."
-            },
-            "to_address": {
-                "type": "string",
-                "description": "Recipient wallet address. Required for transfer."
-            }
-        },
-        "required": ["command"]
-    }
+    # Define parameters schema (one shared dict, not a per-instance copy)
+    parameters: dict = Field(default_factory=lambda: _NEO_WALLET_PARAMETERS)
     
     # Private attributes
     _rpc_url: str = PrivateAttr()
@@ -70,23 +136,16 @@ class NeoWalletTool(BaseTool):
         
         # Determine if we should use mock mode
         # 1. If neo-mamba is missing -> Mock
-        # 2. If config.USE_MOCK_WALLET is True -> Mock
-        self._is_mock = (not HAS_NEO_MAMBA) or getattr(config, 'USE_MOCK_WALLET', False)
+        # 2. If config.USE_MOCK_WALLET is True -> Mock (read per instance; scripts flip it at runtime)
+        self._is_mock = (not HAS_NEO_MAMBA) or config.USE_MOCK_WALLET
         
         if self._is_mock:
-            print("[NeoWalletTool] ⚠️  MOCK MODE ACTIVE. No real blockchain connection.")
-            print("[NeoWalletTool] Using in-memory stateful mock wallet.")
-            # Initialize Mock Balances from file or default
-            try:
-                import json
-                with open("mock_wallet.json", "r") as f:
-                    self._mock_balances = json.load(f)
-            except Exception:
-                self._mock_balances = {"NEO": 100, "GAS": 520.5, "ETH": 4.2}
+            logger.warning("MOCK MODE ACTIVE. No real blockchain connection; balances persist to mock_wallet.state.json.")
+            self._mock_balances = _mock_balances()
         elif private_key_wif:
-            print(f"[NeoWalletTool] Initialized with WIF (Length: {len(private_key_wif)})")
+            logger.debug("Initialized with WIF")
         else:
-            print("[NeoWalletTool] No WIF provided.")
+            logger.warning("No WIF provided.")
 
     async def execute(self, command: str, **kwargs):
         """
@@ -105,7 +164,7 @@ class NeoWalletTool(BaseTool):
     
     def _mock_execute(self, command: str, **kwargs):
         if command == "balance":
-            return self._mock_balances.copy()
+            return _mock_balance_snapshot()
         
         elif command == "transfer":
             asset = kwargs.get('asset')
@@ -122,16 +181,20 @@ class NeoWalletTool(BaseTool):
                 return f"Error: Insufficient {asset} balance. Have {self._mock_balances[asset]}, need {amount}."
             
             # Perform transfer
+            global _balance_snapshot
             self._mock_balances[asset] -= amount
+            _balance_snapshot = None
+            _schedule_persist()
             
             # Generate fake TXID
-            txid = "0x" + "".join(random.choices(string.hexdigits.lower(), k=64))
+            txid = "0x" + secrets.token_hex(32)
             
             return {
                 "status": "success",
                 "txid": txid,
                 "message": f"Sent {amount} {asset} to {to_addr}",
-                "new_balance": self._mock_balances
+                # A plain dict: the caller may serialize or keep it
+                "new_balance": dict(_mock_balance_snapshot())
             }
             
         return f"Unknown mock command: {command}"
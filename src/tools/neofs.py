@@ -1,7 +1,7 @@
 import sys
 import os
+from functools import cached_property, lru_cache
 from typing import List, Optional, Dict, Any
-from dotenv import load_dotenv
 
 
 
@@ -44,37 +44,56 @@ except ImportError as e:
     print(f"[WARNING] Failed to import NeoFS tools: {e}")
     HAS_NEOFS_TOOLS = False
 
-load_dotenv()
+from src import config  # loads .env
+from src.agent_pool import AgentPool
+from src.tools.llm import get_chatbot
+
+@lru_cache(maxsize=1)
+def _neofs_tool_manager() -> ToolManager:
+    """Tools and their name index, built once per process and shared by every agent."""
+    if not HAS_NEOFS_TOOLS:
+        return ToolManager([])
+    return ToolManager([
+        CreateBearerTokenTool(),
+        CreateContainerTool(),
+        UploadObjectTool(),
+        SetContainerEaclTool(),
+        GetContainerEaclTool(),
+        ListContainersTool(),
+        GetContainerInfoTool(),
+        DeleteContainerTool(),
+        GetNetworkInfoTool(),
+        DownloadObjectByIdTool(),
+        DownloadObjectByAttributeTool(),
+        DeleteObjectTool(),
+        SearchObjectsTool(),
+    ])
 
 class NeoFSManager:
-    """Manager for NeoFS operations using SpoonAI tools."""
+    """Manager for NeoFS operations using SpoonAI tools; tools and agents are built on first use."""
     
-    def __init__(self, llm_provider="openrouter", model_name="openai/gpt-4o"):
-        if HAS_NEOFS_TOOLS:
-            self.tools = [
-                CreateBearerTokenTool(),
-                CreateContainerTool(),
-                UploadObjectTool(),
-                SetContainerEaclTool(),
-                GetContainerEaclTool(),
-                ListContainersTool(),
-                GetContainerInfoTool(),
-                DeleteContainerTool(),
-                GetNetworkInfoTool(),
-                DownloadObjectByIdTool(),
-                DownloadObjectByAttributeTool(),
-                DeleteObjectTool(),
-                SearchObjectsTool(),
-            ]
-        else:
-            self.tools = []
-        
-        self.agent = ToolCallAgent(
-            llm=ChatBot(
-                llm_provider=llm_provider,
-                model_name=model_name
-            ),
-            available_tools=ToolManager(self.tools),
+    def __init__(self, llm_provider="openrouter", model_name="openai/gpt-4o", llm: Optional[ChatBot] = None):
+        self.llm_provider = llm_provider
+        self.model_name = model_name
+        self._llm = llm
+
+    @property
+    def tools(self) -> list:
+        return _neofs_tool_manager().tools
+
+    @cached_property
+    def llm(self) -> ChatBot:
+        return self._llm or get_chatbot(self.llm_provider, self.model_name)
+
+    @cached_property
+    def agents(self) -> AgentPool:
+        # An agent handles one run() at a time; concurrent requests get their own
+        return AgentPool(self._build_agent, config.AGENT_MAX_CONCURRENCY)
+
+    def _build_agent(self) -> ToolCallAgent:
+        return ToolCallAgent(
+            llm=self.llm,
+            available_tools=_neofs_tool_manager(),
             system_prompt="""
             You are a NeoFS storage specialist.
             
@@ -96,6 +115,6 @@ class NeoFSManager:
     async def run(self, query: str) -> str:
         """Run a query against the NeoFS agent."""
         try:
-            return await self.agent.run(query)
+            return await self.agents.run(query)
         except Exception as e:
             return f"NeoFS Operation Failed: {str(e)}"
@@ -1,6 +1,37 @@
+import asyncio
 import os
+from typing import Optional, Tuple
+
+from pydantic import Field
 from spoon_ai.tools.base import BaseTool
 
+# prediction_model/final_trade_plan.txt relative to the project root (this file is src/tools/recommendation_tool.py)
+PLAN_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "prediction_model", "final_trade_plan.txt"
+))
+
+# Add a helpful header for the agent
+_PLAN_TEMPLATE = (
+    "📈 **Current Trade Predictions:**\n\n{}\n\n"
+    "💡 *Interpret these signals considering current market conditions and your risk tolerance.*"
+)
+
+# (mtime, formatted plan); the file is only re-read after the prediction model rewrites it
+_plan_cache: Optional[Tuple[float, str]] = None
+
+
+def _read_plan() -> str:
+    with open(PLAN_PATH, "r") as f:
+        return f.read()
+
+
+_TRADE_RECOMMENDATION_PARAMETERS = {
+    "type": "object",
+    "properties": {},
+    "required": []
+}
+
+
 class TradeRecommendationTool(BaseTool):
     name: str = "get_trade_recommendations"
     description: str = (
@@ -9,31 +40,26 @@ class TradeRecommendationTool(BaseTool):
         "market recommendations, ETH signals, BTC signals, or trading advice. "
         "Returns sentiment-based BUY/SELL signals with macro context analysis."
     )
-    
-    parameters: dict = {
-        "type": "object",
-        "properties": {},
-        "required": []
-    }
+
+    parameters: dict = Field(default_factory=lambda: _TRADE_RECOMMENDATION_PARAMETERS)
 
     async def execute(self):
         """
         Reads the final_trade_plan.txt file and returns its content.
+        Disk access runs in a worker thread; unchanged files are served from memory.
         """
-        # Assuming the file is at prediction_model/final_trade_plan.txt relative to project root
-        # We need to find the project root from this file's location: src/tools/recommendation_tool.py
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
-        plan_path = os.path.join(project_root, "prediction_model", "final_trade_plan.txt")
-        
+        global _plan_cache
         try:
-            if not os.path.exists(plan_path):
-                return f"Error: Trade plan file not found at {plan_path}"
-                
-            with open(plan_path, "r") as f:
-                content = f.read()
-            
-            # Add a helpful header for the agent
-            return f"📈 **Current Trade Predictions:**\n\n{content}\n\n💡 *Interpret these signals considering current market conditions and your risk tolerance.*"
+            try:
+                mtime = (await asyncio.to_thread(os.stat, PLAN_PATH)).st_mtime
+            except FileNotFoundError:
+                return f"Error: Trade plan file not found at {PLAN_PATH}"
+
+            if _plan_cache is not None and _plan_cache[0] == mtime:
+                return _plan_cache[1]
+
+            content = await asyncio.to_thread(_read_plan)
+            _plan_cache = (mtime, _PLAN_TEMPLATE.format(content))
+            return _plan_cache[1]
         except Exception as e:
             return f"Error reading trade plan: {str(e)}"
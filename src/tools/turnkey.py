@@ -1,7 +1,7 @@
 import sys
 import os
-from typing import List
-from dotenv import load_dotenv
+from functools import cached_property, lru_cache
+from typing import List, Optional
 
 from spoon_ai.agents.toolcall import ToolCallAgent
 from spoon_ai.tools import ToolManager
@@ -31,42 +31,60 @@ except ImportError as e:
     print(f"[WARNING] Failed to import Turnkey tools: {e}")
     HAS_TURNKEY_TOOLS = False
 
-load_dotenv()
+from src import config  # loads .env
+from src.agent_pool import AgentPool
+from src.tools.llm import get_chatbot
+
+@lru_cache(maxsize=1)
+def _turnkey_tool_manager() -> ToolManager:
+    """Tools and their name index, built once per process and shared by every agent."""
+    if not HAS_TURNKEY_TOOLS:
+        return ToolManager([])
+    return ToolManager([
+        SignEVMTransactionTool(),
+        SignMessageTool(),
+        SignTypedDataTool(),
+        BroadcastTransactionTool(),
+        BuildUnsignedEIP1559TxTool(),
+        CompleteTransactionWorkflowTool(),
+        ListWalletsTool(),
+        ListWalletAccountsTool(),
+        ListAllAccountsTool(),
+        GetWalletTool(),
+        CreateWalletTool(),
+        CreateWalletAccountsTool(),
+        BatchSignTransactionsTool(),
+        GetActivityTool(),
+        ListActivitiesTool(),
+        WhoAmITool(),
+    ])
 
 class TurnkeyWalletManager:
-    """Manager for Turnkey secure wallet operations."""
+    """Manager for Turnkey secure wallet operations; tools and agents are built on first use."""
 
-    def __init__(self, llm_provider="openrouter", model_name="openai/gpt-4o"):
-        if HAS_TURNKEY_TOOLS:
-            self.tools = [
-                SignEVMTransactionTool(),
-                SignMessageTool(),
-                SignTypedDataTool(),
-                BroadcastTransactionTool(),
-                BuildUnsignedEIP1559TxTool(),
-                CompleteTransactionWorkflowTool(),
-                ListWalletsTool(),
-                ListWalletAccountsTool(),
-                ListAllAccountsTool(),
-                GetWalletTool(),
-                CreateWalletTool(),
-                CreateWalletAccountsTool(),
-                BatchSignTransactionsTool(),
-                GetActivityTool(),
-                ListActivitiesTool(),
-                WhoAmITool(),
-            ]
-        else:
-            self.tools = []
-        
+    def __init__(self, llm_provider="openrouter", model_name="openai/gpt-4o", llm: Optional[ChatBot] = None):
+        self.llm_provider = llm_provider
+        self.model_name = model_name
+        self._llm = llm
         self.network = os.getenv("TURNKEY_NETWORK", "sepolia")
-        
-        self.agent = ToolCallAgent(
-            llm=ChatBot(
-                llm_provider=llm_provider,
-                model_name=model_name
-            ),
-            available_tools=ToolManager(self.tools),
+
+    @property
+    def tools(self) -> list:
+        return _turnkey_tool_manager().tools
+
+    @cached_property
+    def llm(self) -> ChatBot:
+        return self._llm or get_chatbot(self.llm_provider, self.model_name)
+
+    @cached_property
+    def agents(self) -> AgentPool:
+        # An agent handles one run() at a time; concurrent requests get their own
+        return AgentPool(self._build_agent, config.AGENT_MAX_CONCURRENCY)
+
+    def _build_agent(self) -> ToolCallAgent:
+        return ToolCallAgent(
+            llm=self.llm,
+            available_tools=_turnkey_tool_manager(),
             system_prompt=f"""
             You are a Turnkey secure wallet assistant.
             Network: {self.network}
@@ -85,6 +103,6 @@ class TurnkeyWalletManager:
     async def run(self, query: str) -> str:
         """Run a query against the Turnkey agent."""
         try:
-            return await self.agent.run(query)
+            return await self.agents.run(query)
         except Exception as e:
             return f"Turnkey Operation Failed: {str(e)}"
@@ -1,10 +1,12 @@
-import sys
-import os
-import json
 import asyncio
+import logging
+from functools import lru_cache
 
-# Ensure we can import from spoonos_components
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../spoonos_components')))
+from pydantic import Field
+
+from src import fastjson
+
+logger = logging.getLogger(__name__)
 
 try:
     from spoon_ai.tools.base import BaseTool
@@ -15,13 +17,43 @@ try:
     from neo3.wallet import Wallet
     HAS_NEO_MAMBA = True
 except ImportError as e:
-    print(f"[Warning] neo-mamba not installed or build failed ({e}). Running in MOCK mode.")
+    logger.warning("neo-mamba not installed or build failed (%s). Running in MOCK mode.", e)
     from spoon_ai.tools.base import BaseTool
     # Fallback/Mock classes
     HAS_NEO_MAMBA = False
     class Wallet: pass
 
 
+_TURNKEY_NEO_WALLET_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "command": {
+            "type": "string", 
+            "description": "Operation to perform. Supported: 'balance', 'send'"
+        },
+        "to_address": {
+            "type": "string",
+            "description": "Recipient address for 'send' command"
+        },
+        "amount": {
+            "type": "number",
+            "description": "Amount to send for 'send' command"
+        },
+        "asset": {
+            "type": "string",
+            "description": "Asset symbol (GAS or NEO), default GAS"
+        }
+    },
+    "required": ["command"]
+}
+
+@lru_cache(maxsize=1)
+def _turnkey_client():
+    """One Turnkey client per process, shared by every tool instance (credentials come from the env)."""
+    return Turnkey()
+
+_MOCK_BALANCE_JSON = fastjson.dumps({"GAS": 100.0, "NEO": 10})
+
 class TurnkeyNeoWalletTool(BaseTool):
     """
     A Tool that uses Turnkey (Remote HSM) to sign Neo N3 transactions.
@@ -29,48 +61,24 @@ class TurnkeyNeoWalletTool(BaseTool):
     """
     name: str = "turnkey_neo_wallet"
     description: str = "Manage Neo N3 assets and transactions using Turnkey secure signing. Capabilities: get balance, send assets (gas)."
-    parameters: dict = {
-        "type": "object",
-        "properties": {
-            "command": {
-                "type": "string", 
-                "description": "Operation to perform. Supported: 'balance', 'send'"
-            },
-            "to_address": {
-                "type": "string",
-                "description": "Recipient address for 'send' command"
-            },
-            "amount": {
-                "type": "number",
-                "description": "Amount to send for 'send' command"
-            },
-            "asset": {
-                "type": "string",
-                "description": "Asset symbol (GAS or NEO), default GAS"
-            }
-        },
-        "required": ["command"]
-    }
+    parameters: dict = Field(default_factory=lambda: _TURNKEY_NEO_WALLET_PARAMETERS)
 
     def __init__(self, rpc_url: str, turnkey_sign_with: str):
         super().__init__()
         self._rpc_url = rpc_url
         self._sign_with = turnkey_sign_with
-        self._client = None
         self._is_mock = not HAS_NEO_MAMBA
 
         if self._is_mock:
-            print("[TurnkeyNeo] ⚠️  MOCK MODE ACTIVE. No real blockchain connection.")
+            logger.warning("MOCK MODE ACTIVE. No real blockchain connection.")
         elif turnkey_sign_with:
-            print(f"[TurnkeyNeo] Initialized with Key ID: {turnkey_sign_with}")
+            logger.debug("Initialized with Key ID: %s", turnkey_sign_with)
         else:
-            print("[TurnkeyNeo] ⚠️  No Signing Identity (TURNKEY_SIGN_WITH) provided.")
+            logger.warning("No Signing Identity (TURNKEY_SIGN_WITH) provided.")
 
     @property
     def client(self):
-        if self._client is None:
-            self._client = Turnkey()
-        return self._client
+        return _turnkey_client()
 
     async def execute(self, command: str, **kwargs):
         if self._is_mock:
@@ -89,7 +97,7 @@ class TurnkeyNeoWalletTool(BaseTool):
 
     async def _mock_execute(self, command: str, **kwargs):
         if command == "balance":
-            return json.dumps({"GAS": 100.0, "NEO": 10})
+            return _MOCK_BALANCE_JSON
         elif command == "send":
             return f"✅ [MOCK] Sent {kwargs.get('amount')} {kwargs.get('asset')} to {kwargs.get('to_address')} via Turnkey Signer {self._sign_with}"
         return f"Mock received command: {command}"
@@ -111,7 +119,7 @@ class TurnkeyNeoWalletTool(BaseTool):
         # tx_hash = tx.hash()
         
         # 2. Sign with Turnkey
-        print(f"[TurnkeyNeo] Requesting signature for transaction from Turnkey (ID: {self._sign_with})...")
+        logger.info("Requesting signature for transaction from Turnkey (ID: %s)", self._sign_with)
         
         # Mocking a hash for demonstration
         mock_tx_hash = "0000000000000000000000000000000000000000000000000000000000000001"
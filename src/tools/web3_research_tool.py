@@ -1,34 +1,33 @@
-import sys
-import os
 import asyncio
+import logging
+from pydantic import Field
 from spoon_ai.tools.base import BaseTool
 
-# Add project root to sys.path to allow importing from spoonos_components
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
-if project_root not in sys.path:
-    sys.path.append(project_root)
-
+# spoonos_components sits next to src/, so it is importable whenever this module is.
 # Import DeclarativeCryptoAnalysis deeply to avoid import errors during init if dependencies are missing
 try:
     from spoonos_components.crypto_analysis import DeclarativeCryptoAnalysis
 except ImportError:
     DeclarativeCryptoAnalysis = None
 
+logger = logging.getLogger(__name__)
+
+_WEB3_RESEARCH_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "Optional specific topic or token to focus on (currently performs broad market analysis)."
+        }
+    },
+    "required": []
+}
+
 class Web3ResearchTool(BaseTool):
     name: str = "web3_research_tool"
     description: str = "Performs deep web3 market research and token analysis using Binance data and LLM insights. Use this when asked about market trends, specific token analysis, or general crypto research."
     
-    parameters: dict = {
-        "type": "object",
-        "properties": {
-            "query": {
-                "type": "string",
-                "description": "Optional specific topic or token to focus on (currently performs broad market analysis)."
-            }
-        },
-        "required": []
-    }
+    parameters: dict = Field(default_factory=lambda: _WEB3_RESEARCH_PARAMETERS)
 
     async def execute(self, query: str = ""):
         """
@@ -38,7 +37,7 @@ class Web3ResearchTool(BaseTool):
             return "Error: Could not import spoonos_components.crypto_analysis. Please check your installation."
         
         try:
-            print(f"[Web3ResearchTool] Starting analysis for query: {query}...")
+            logger.info("Starting analysis for query: %s", query)
             analyzer = DeclarativeCryptoAnalysis()
             result = await analyzer.run(query=query)
             
@@ -1,8 +1,32 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import speech_recognition as sr
 from elevenlabs import ElevenLabs
-from elevenlabs.play import play
+from elevenlabs.play import is_installed, play, stream
 from src import config
 
+try:
+    import numpy as np
+    from faster_whisper import WhisperModel
+    HAS_WHISPER = True
+except ImportError:
+    HAS_WHISPER = False
+
+# Voice ID for Rachel
+VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+TTS_MODEL_ID = "eleven_multilingual_v2"
+
+# mpv plays MP3 chunks as they arrive; without it, fall back to ffplay on the whole clip
+_CAN_STREAM = is_installed("mpv")
+
+# Split points after sentence-ending punctuation
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def split_sentences(text: str) -> list:
+    """Splits text into sentences for incremental synthesis."""
+    return [part for part in _SENTENCE_END.split(text.strip()) if part]
+
 class VoiceAssistant:
     def __init__(self):
         if not config.ELEVENLABS_API_KEY:
@@ -16,22 +40,89 @@ class VoiceAssistant:
         # Increase energy threshold dynamic adjustment speed
         self.recognizer.dynamic_energy_adjustment_ratio = 1.5
 
+        # Opened on the first listen() and kept open; reopening the device costs 100-300 ms a turn
+        self._microphone = None
+        self._source = None
+        # The noise floor is measured once; dynamic_energy_threshold tracks drift during listen()
+        self._calibrated = False
+        # Synthesizes the next sentence while speak() plays the current one; kept for the
+        # session so an utterance doesn't pay for starting a thread
+        self._synth = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flowchain-tts")
+
+        # Local speech-to-text skips the upload and round-trip to Google; the model loads once
+        self._whisper = None
+        if config.STT_ENGINE == "whisper":
+            if HAS_WHISPER:
+                self._whisper = WhisperModel(config.WHISPER_MODEL, device="cpu", compute_type="int8")
+            else:
+                print("⚠️ STT_ENGINE=whisper but faster-whisper is not installed; using Google STT")
+
+    def _open_source(self):
+        """Returns the open microphone source, opening it or resuming its stream as needed."""
+        if self._source is None:
+            self._microphone = sr.Microphone()
+            self._source = self._microphone.__enter__()
+        else:
+            self._source.stream.pyaudio_stream.start_stream()
+        return self._source
+
+    def _pause_source(self):
+        # Stop capturing between turns so our own TTS playback isn't buffered as input
+        if self._source is not None:
+            self._source.stream.pyaudio_stream.stop_stream()
+
+    def close(self):
+        """Releases the microphone and the synthesis thread; the next listen()/speak() reopens them."""
+        if self._synth is not None:
+            synth, self._synth = self._synth, None
+            synth.shutdown(wait=False, cancel_futures=True)
+        if self._source is not None:
+            microphone, self._microphone, self._source = self._microphone, None, None
+            try:
+                microphone.__exit__(None, None, None)
+            except Exception as e:
+                print(f"⚠️ Error closing microphone: {e}")
+
+    def _transcribe(self, audio: sr.AudioData) -> str:
+        """Speech to text with the configured engine; raises sr.UnknownValueError if nothing was said."""
+        if self._whisper is None:
+            # Using google speech recognition as it's free and decent default
+            return self.recognizer.recognize_google(audio)
+        # Whisper expects 16 kHz mono float32 in [-1, 1]
+        pcm = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self._whisper.transcribe(samples, beam_size=1, language="en")
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def listen(self) -> str:
         """
         Listens to the microphone and returns text.
         Returns empty string on failure.
         """
         try:
-            with sr.Microphone() as source:
+            source = self._open_source()
+            try:
                 print("🎤 Listening...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                if not self._calibrated:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    self._calibrated = True
                 # timeout: max seconds to wait for speech to start
                 # phrase_time_limit: max seconds to allow for a single utterance
                 audio = self.recognizer.listen(source, timeout=5.0, phrase_time_limit=15.0)
+            finally:
+                self._pause_source()
 
             print("📝 Converting speech to text...")
-            # Using google speech recognition as it's free and decent default
-            text = self.recognizer.recognize_google(audio)
+            text = self._transcribe(audio)
             print(f"You said: {text}")
             return text
 
@@ -41,26 +132,67 @@ class VoiceAssistant:
         except sr.UnknownValueError:
             print("❌ Could not understand audio")
             return ""
+        except sr.WaitTimeoutError:
+            print("❌ No speech detected")
+            return ""
         except Exception as e:
             print(f"❌ Error listening: {e}")
+            # The device may be gone; reopen it on the next turn
+            self.close()
             return ""
 
-    def speak(self, text: str):
+    def _convert(self, text: str):
+        """Returns an iterator over the MP3 chunks for the text as ElevenLabs sends them."""
+        return self.client.text_to_speech.convert(
+            voice_id=VOICE_ID,
+            model_id=TTS_MODEL_ID,
+            text=text
+        )
+
+    def _synthesize(self, text: str) -> bytes:
+        """Generates the full audio clip for one piece of text."""
+        return b"".join(self._convert(text))
+
+    @staticmethod
+    def _play(audio):
+        if _CAN_STREAM:
+            stream(audio)
+        else:
+            play(audio)
+
+    def generate_audio_bytes(self, text: str, mood: str = "neutral") -> bytes:
+        """
+        Returns the MP3 audio for the text without playing it (used by the web server).
+        Returns empty bytes on failure. The mood is informational, as in speak().
+        """
+        if not text or not text.strip():
+            return b""
+        try:
+            return self._synthesize(text)
+        except Exception as e:
+            print(f"❌ Error generating audio: {e}")
+            return b""
+
+    def speak(self, text: str, mood: str = "neutral"):
         """
         Generates audio for the text and plays it.
+        The first sentence plays as its chunks arrive (with mpv installed) and each
+        later one is synthesized while the previous one plays, so audio starts with
+        the first chunk rather than the whole reply.
+        The mood is currently informational; the same voice is used for all moods.
         """
-        if not text:
+        if not text or not text.strip():
             return
 
         try:
-            # Generate audio using ElevenLabs Client
-            # Voice ID for Rachel: 21m00Tcm4TlvDq8ikWAM
-            audio = self.client.text_to_speech.convert(
-                voice_id="21m00Tcm4TlvDq8ikWAM",
-                model_id="eleven_multilingual_v2",
-                text=text
-            )
-            # Play the audio
-            play(audio)
+            sentences = split_sentences(text)
+            audio = self._convert(sentences[0])
+            if self._synth is None:
+                self._synth = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flowchain-tts")
+            for sentence in sentences[1:]:
+                pending = self._synth.submit(self._synthesize, sentence)
+                self._play(audio)
+                audio = iter((pending.result(),))
+            self._play(audio)
         except Exception as e:
             print(f"❌ Error generating/playing audio: {e}")
@@ -10,7 +10,8 @@ import sys
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.neo_wallet_agent import FlowChainNeoIntegration, demo_neo_wallet
+from src.neo_wallet_agent import FlowChainNeoIntegration, close_rpc_session, demo_neo_wallet
+from src.eventloop import install_fast_event_loop
 
 async def test_neo_integration():
     """Test the Neo wallet integration"""
@@ -53,6 +54,8 @@ async def test_neo_integration():
         print(f"❌ Test failed with error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        await close_rpc_session()
 
 async def run_full_demo():
     """Run the full Neo wallet demo"""
@@ -66,6 +69,7 @@ if __name__ == "__main__":
     print("2. Run full demo")
     print("3. Run both")
     
+    install_fast_event_loop()
     try:
         choice = input("Enter choice (1-3): ").strip()
         
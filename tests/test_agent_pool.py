@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Setup path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agent_pool import AgentPool
+
+
+class FakeAgent:
+    def __init__(self, log):
+        self.log = log
+
+    async def run(self, query):
+        self.log.append((self, "start"))
+        await asyncio.sleep(0.01)
+        self.log.append((self, "end"))
+        return f"{id(self)}:{query}"
+
+
+class TestAgentPool(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_one_agent_for_sequential_runs(self):
+        built = []
+        pool = AgentPool(lambda: built.append(FakeAgent([])) or built[-1], size=4)
+        await pool.run("a")
+        await pool.run("b")
+        self.assertEqual(len(built), 1)
+
+    async def test_concurrency_is_bounded_by_size(self):
+        log = []
+        built = []
+        pool = AgentPool(lambda: built.append(FakeAgent(log)) or built[-1], size=2)
+        await asyncio.gather(*(pool.run(str(i)) for i in range(5)))
+        self.assertEqual(len(built), 2)
+        running = peak = 0
+        for _, event in log:
+            running += 1 if event == "start" else -1
+            peak = max(peak, running)
+        self.assertEqual(peak, 2)
+
+    async def test_failed_factory_frees_its_slot(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("no agent")
+            return FakeAgent([])
+
+        pool = AgentPool(factory, size=1)
+        with self.assertRaises(RuntimeError):
+            await pool.run("a")
+        self.assertTrue((await pool.run("b")).endswith(":b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
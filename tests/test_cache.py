@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Setup path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache import TTLCache, normalize_query
+
+
+class TestTTLCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.clock = lambda: self.now
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache(ttl=10.0, clock=self.clock)
+        cache.set("key", "value")
+        self.now += 9.9
+        self.assertEqual(cache.get("key"), "value")
+        self.now += 0.1
+        self.assertIsNone(cache.get("key"))
+
+    def test_per_entry_ttl(self):
+        cache = TTLCache(ttl=10.0, clock=self.clock)
+        cache.set("short", 1, ttl=1.0)
+        cache.set("long", 2)
+        self.now += 2
+        self.assertEqual(cache.get("short", "missing"), "missing")
+        self.assertEqual(cache.get("long"), 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(ttl=10.0, maxsize=2, clock=self.clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    async def test_get_or_set_makes_one_call_for_concurrent_misses(self):
+        cache = TTLCache(ttl=10.0, clock=self.clock)
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return "fresh"
+
+        results = await asyncio.gather(*(cache.get_or_set("key", factory) for _ in range(5)))
+        self.assertEqual(results, ["fresh"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  What's my   BALANCE?! "), "whats my balance")
+
+
+if __name__ == "__main__":
+    unittest.main()
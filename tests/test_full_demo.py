@@ -12,10 +12,11 @@ from src import config
 config.ENABLE_VOICE = True
 config.ELEVENLABS_API_KEY = "mock_key"
 
-from src.main import main, FlowChainAgent, interactive_loop
+class TestFullDemoFlow(unittest.IsolatedAsyncioTestCase):
+    async def test_demo_loop(self):
+        # Imported here so collecting the test doesn't load the agent stack
+        from src.main import FlowChainAgent, interactive_loop
 
-class TestFullDemoFlow(unittest.TestCase):
-    async def run_interaction(self):
         # Mock Voice Assistant
         mock_voice = MagicMock()
         
@@ -106,8 +107,5 @@ class TestFullDemoFlow(unittest.TestCase):
         
         print("[TEST] SUCCESS: Voice Loop verified.")
 
-    def test_demo_loop(self):
-        asyncio.run(self.run_interaction())
-
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import unittest
+
+# Setup path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.intent import classify_local, detect_mood, match_intent
+
+
+class TestMatchIntent(unittest.TestCase):
+    def test_routes_domain_phrases(self):
+        cases = {
+            "upload this pdf to NeoFS": "neofs",
+            "download the file I stored yesterday": "neofs",
+            "store my documents somewhere safe": "neofs",
+            "sign this transaction for me": "turnkey",
+            "create a new wallet": "turnkey",
+            "run a batch transfer": "turnkey",
+            "show me the ETH price chart": "market",
+            "what's the RSI on bitcoin": "market",
+            "is BTC near a support level": "market",
+            "What's the trend for ETH?": "market",
+        }
+        for query, category in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(match_intent(query), category)
+
+    def test_everyday_words_are_left_to_the_router(self):
+        for query in (
+            "Thanks for your support!",
+            "What is in store for NEO this year?",
+            "Can you explain the technical details of proof of stake?",
+            "I want to sign up for alerts",
+            "what is the trend in my spending",
+            "where can I download the app",
+            "Sell to minimize losses.",
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(match_intent(query))
+
+    def test_leftmost_keyword_wins(self):
+        self.assertEqual(match_intent("check the BTC price, then upload the chart"), "market")
+
+
+class TestClassifyLocal(unittest.TestCase):
+    def test_confident_specialist_requests(self):
+        cases = {
+            "back up my tax documents to the network": "neofs",
+            "save my photos somewhere permanent on the network": "neofs",
+            "approve the transfer from my hardware account please": "turnkey",
+            "give me a forecast for ethereum next month": "market",
+        }
+        for query, category in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(classify_local(query), category)
+
+    def test_off_topic_and_general_queries_go_to_the_llm(self):
+        for query in (
+            "is it a good time to learn about blockchain development",
+            "is bitcoin a scam or a legit investment for retirement",
+            "what time is it in tokyo right now",
+            "how do i set up a new email account",
+            "is this a good time to buy a house",
+            "who won the football game last night",
+            "explain how proof of stake works in simple terms",
+            "what is my neo balance right now please",
+            "what can you do for me as an assistant",
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(classify_local(query))
+
+    def test_too_few_known_words(self):
+        self.assertIsNone(classify_local("bitcoin"))
+        self.assertIsNone(classify_local("give me a recipe for dinner tonight"))
+
+
+class TestDetectMood(unittest.TestCase):
+    def test_whole_words_only(self):
+        self.assertEqual(detect_mood("Goodbye, the trade failed"), "serious")
+        self.assertEqual(detect_mood("That address looks insecure"), "neutral")
+        self.assertEqual(detect_mood("Claim the airdrop before Friday"), "neutral")
+
+    def test_inflections_still_count(self):
+        self.assertEqual(detect_mood("Your gains are up 4% today"), "happy")
+        self.assertEqual(detect_mood("ETH dropped 5% in the last hour"), "serious")
+
+    def test_first_mood_word_wins(self):
+        self.assertEqual(detect_mood("Good news: no loss this week"), "happy")
+
+
+if __name__ == "__main__":
+    unittest.main()
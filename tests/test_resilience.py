@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+
+# Setup path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.resilience import CircuitBreaker, CircuitOpenError, retry_async
+
+
+def _no_backoff(attempts=3, **kwargs):
+    return iter([0] * (attempts - 1))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _fail():
+    raise RuntimeError("boom")
+
+
+async def _ok():
+    return "ok"
+
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.breaker = CircuitBreaker("test", fail_max=2, reset_timeout=30.0, clock=self.clock)
+
+    async def trip(self):
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                await self.breaker.call(_fail)
+
+    async def test_opens_after_fail_max_consecutive_failures(self):
+        with self.assertRaises(RuntimeError):
+            await self.breaker.call(_fail)
+        self.assertFalse(self.breaker.is_open)
+        with self.assertRaises(RuntimeError):
+            await self.breaker.call(_fail)
+        self.assertTrue(self.breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.call(_ok)
+
+    async def test_success_resets_the_failure_count(self):
+        with self.assertRaises(RuntimeError):
+            await self.breaker.call(_fail)
+        await self.breaker.call(_ok)
+        with self.assertRaises(RuntimeError):
+            await self.breaker.call(_fail)
+        self.assertFalse(self.breaker.is_open)
+
+    async def test_successful_trial_closes_the_circuit(self):
+        await self.trip()
+        self.clock.now += 31
+        self.assertEqual(await self.breaker.call(_ok), "ok")
+        self.assertEqual(await self.breaker.call(_ok), "ok")
+
+    async def test_failed_trial_reopens_the_circuit(self):
+        await self.trip()
+        self.clock.now += 31
+        with self.assertRaises(RuntimeError):
+            await self.breaker.call(_fail)
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.call(_ok)
+
+    async def test_only_one_trial_call_while_half_open(self):
+        await self.trip()
+        self.clock.now += 31
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        trial = asyncio.create_task(self.breaker.call(slow))
+        await asyncio.sleep(0)
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.call(_ok)
+        release.set()
+        self.assertEqual(await trial, "ok")
+        self.assertEqual(await self.breaker.call(_ok), "ok")
+
+
+@patch("src.resilience.backoff_delays", _no_backoff)
+class TestRetryAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_transient_errors(self):
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise aiohttp.ClientConnectionError("reset")
+            return "ok"
+
+        self.assertEqual(await retry_async(flaky, attempts=3), "ok")
+        self.assertEqual(len(calls), 3)
+
+    async def test_gives_up_after_the_last_attempt(self):
+        calls = []
+
+        async def down():
+            calls.append(1)
+            raise asyncio.TimeoutError()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await retry_async(down, attempts=3)
+        self.assertEqual(len(calls), 3)
+
+    async def test_does_not_retry_other_errors(self):
+        calls = []
+
+        async def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            await retry_async(broken, attempts=3)
+        self.assertEqual(len(calls), 1)
+
+    async def test_never_retries_an_open_circuit(self):
+        calls = []
+
+        async def rejected():
+            calls.append(1)
+            raise CircuitOpenError("down")
+
+        with self.assertRaises(CircuitOpenError):
+            await retry_async(rejected, attempts=3, retry_on=(Exception,))
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
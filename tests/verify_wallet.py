@@ -1,49 +1,87 @@
 import asyncio
 import os
+import socket
 import sys
+import traceback
+from urllib.parse import urlsplit
 
-# Ensure src can be imported
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# Ensure src can be imported; only once, however the script is started
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from src import config
 from src.tools.neo_tool import NeoWalletTool
+from src.neo_wallet_agent import close_rpc_session, neo_rpc_batch
+from src.eventloop import install_fast_event_loop
+
+# A reachable RPC node accepts a TCP connection well within this
+PROBE_TIMEOUT = 1.5
+
+async def probe(rpc_url) -> bool:
+    """Resolves and connects to the RPC host before any TLS or RPC work; prints why it failed."""
+    parts = urlsplit(rpc_url)
+    if not parts.hostname:
+        print(f"❌ FAILED (config): RPC URL has no host: {rpc_url!r}")
+        return False
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, port), PROBE_TIMEOUT)
+    except socket.gaierror as e:
+        print(f"❌ FAILED (DNS): cannot resolve {parts.hostname}: {e}")
+        return False
+    except (OSError, asyncio.TimeoutError) as e:
+        print(f"❌ FAILED (TCP): cannot connect to {parts.hostname}:{port}: {str(e) or 'timed out'}")
+        return False
+    writer.close()
+    await writer.wait_closed()
+    return True
 
 async def verify():
     print("--- Verifying Neo Wallet Setup ---")
     
-    # Reload config to pick up any new env vars if set freshly
-    # (Though typically script restart is needed)
-    
-    if not config.NEO_WIF:
+    # config has already read the .env file; a script restart is needed to pick up changes
+    wif = config.NEO_WIF
+    rpc_url = config.NEO_RPC_URL
+
+    if not wif:
         print("ERROR: NEO_WIF not found in environment variables.")
         print("Please create a .env file and add your Private Key (WIF).")
         return
 
-    print(f"RPC URL: {config.NEO_RPC_URL}")
+    print(f"RPC URL: {rpc_url}")
+    if not await probe(rpc_url):
+        print("Check your RPC URL and internet connection.")
+        return
     
     try:
-        # Note: The tool implementation details are inferred. 
-        # config.NEO_WIF is the value, but NeoWalletTool might expect the env var NAME or the VALUE.
-        # src/main.py uses private_key_env="NEO_WIF", implying it looks up the env var by name.
-        if "NEO_WIF" not in os.environ:
-             # Just in case config loaded it but it's not in os.environ for the tool (unlikely if load_dotenv used)
-             pass
-
+        # NeoWalletTool takes the WIF value itself, not the name of the env var
         wallet = NeoWalletTool(
-            rpc_url=config.NEO_RPC_URL,
-            private_key_wif=config.NEO_WIF
+            rpc_url=rpc_url,
+            private_key_wif=wif
         )
         
         print("Connecting to network...")
-        balance = await wallet.get_balance()
+        # Node version and chain height in one JSON-RPC batch round-trip, alongside the balance
+        replies, balance = await asyncio.gather(
+            neo_rpc_batch([("getversion", []), ("getblockcount", [])], rpc_url),
+            wallet.get_balance(),
+        )
+        for reply in replies.values():
+            if "error" in reply:
+                raise RuntimeError(reply["error"].get("message", reply["error"]))
+        print(f"🌐 Node: {replies[0]['result'].get('useragent', 'unknown')}, block height {replies[1]['result']}")
         print(f"✅ Success! Connection established.")
-        print(f"💰 Balance: {balance} GAS")
+        # GAS has 8 decimals; NEO is indivisible
+        print(f"💰 Balance: {balance.get('NEO', 0)} NEO, {balance.get('GAS', 0):.8f} GAS")
         
     except Exception as e:
         print(f"❌ FAILED: {e}")
         print("Check your WIF key, RPC URL, and internet connection.")
-        import traceback
         traceback.print_exc()
+    finally:
+        await close_rpc_session()
 
 if __name__ == "__main__":
+    install_fast_event_loop()
     asyncio.run(verify())